@@ -1,41 +1,103 @@
 from asyncpg import Pool
 from app.usecase.document import upload_document
-from app.usecase.compliance import build_compliance_graph
 from app.services.embedding import EmbeddingService
 from app.services.llm import LLMService
-from app.repository.document import fetch_document_chunks
+from app.services.regulation_corpus import RegulationCorpus
+from app.services.llm_limiter import INTERACTIVE, BATCH
+from app.usecase.compliance import initial_state, audit_documents
+from app.services.upload import remove_upload
 from loguru import logger
-from typing import List, Dict
+from contextlib import aclosing
+from pathlib import Path
+from typing import List, Dict, Tuple, AsyncIterator
+import asyncio
 
 class DocumentController:
-    def __init__(self, embedding_service: EmbeddingService, llm_service: LLMService):
+    def __init__(self, embedding_service: EmbeddingService, llm_service: LLMService,
+                 regulation_corpus: RegulationCorpus, compliance_graph):
         self.embedding_service = embedding_service
         self.llm_service = llm_service
-        self.compliance_graph = build_compliance_graph()
+        self.regulation_corpus = regulation_corpus
+        self.compliance_graph = compliance_graph
 
-    async def upload_document(self, file_path: str, pool: Pool) -> List[int]:  # document upload
+    async def upload_document(self, file_path: str, pool: Pool, content_hash: str,
+                              force: bool = False) -> Tuple[int, bool]:  # document upload
         logger.info(f"Processing upload for {file_path}")
-        document_ids = await upload_document(file_path, pool)
-        return document_ids
+        return await upload_document(file_path, pool, self.embedding_service, content_hash, force)
 
-    async def audit_document(self, document_id: int, pool: Pool) -> Dict:   #audit document 
+    async def audit_document(self, document_id: int, pool: Pool, priority: int = INTERACTIVE) -> Dict:   #audit document 
         logger.info(f"Auditing document_id: {document_id}")
         result = await self.compliance_graph.ainvoke(
-            {
-                "document_id": document_id,
-                "document_text": "",
-                "matched_sections": [],
-                "audit_result": {},
-                "pool": pool
-            }
+            initial_state(
+                document_id, pool, self.embedding_service, self.llm_service, self.regulation_corpus, priority=priority
+            )
         )
-        audit_result = result["audit_result"]
-        chunks = await fetch_document_chunks(pool, document_id)
+        return self._audit_response(result["audit_result"], result["filename"])
+
+    async def stream_audit(self, document_id: int, pool: Pool) -> AsyncIterator[Dict]:   # audit progress events
+        logger.info(f"Streaming audit for document_id: {document_id}")
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def on_token(text: str, segment: int) -> None:
+            events.put_nowait({"event": "token", "data": {"segment": segment, "text": text}})
+
+        async def run() -> None:
+            state = initial_state(
+                document_id, pool, self.embedding_service, self.llm_service, self.regulation_corpus, on_token
+            )
+            try:
+                async for update in self.compliance_graph.astream(state, stream_mode="updates"):
+                    for stage, state in update.items():     # nodes return the whole state
+                        events.put_nowait({"event": "stage", "data": {"stage": stage, "status": "completed"}})
+                events.put_nowait({"event": "result", "data": self._audit_response(state["audit_result"], state["filename"])})
+            except Exception as e:
+                logger.error(f"Streaming audit failed for document_id {document_id}: {e}")
+                events.put_nowait({"event": "error", "data": {"document_id": document_id, "error": str(e)}})
+            finally:
+                events.put_nowait(done)
+
+        yield {"event": "stage", "data": {"stage": "retrieve", "status": "started"}}
+        task = asyncio.create_task(run())
+        try:
+            while (event := await events.get()) is not done:
+                yield event
+        finally:
+            task.cancel()       # client went away, stop the audit
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _audit_response(self, audit_result: Dict, filename: str) -> Dict:
         return {
             "document_id": audit_result["document_id"],
-            "filename": chunks[0]["filename"],
+            "filename": filename,
             "compliance_status": audit_result["compliance_status"],
             "dpdp_sections_analyzed": audit_result["dpdp_section"],
             "compliance_gaps": audit_result["gaps"],
             "recommendations": audit_result["suggestions"]
-        }
\ No newline at end of file
+        }
+
+    async def audit_documents(self, document_ids: List[int], pool: Pool) -> AsyncIterator[Dict]:   # batch audit
+        logger.info(f"Batch auditing {len(document_ids)} documents")
+        results = audit_documents(document_ids, pool, self.embedding_service, self.llm_service, self.regulation_corpus)
+        async with aclosing(results):       # closing this generator cancels the audits still running
+            async for document_id, filename, audit_result, error in results:
+                if error:
+                    yield {"document_id": document_id, "error": error}
+                else:
+                    yield self._audit_response(audit_result, filename)
+
+    async def run_audit_job(self, payload: Dict, pool: Pool) -> Dict:     # job queue handler
+        return await self.audit_document(payload["document_id"], pool, priority=BATCH)
+
+    async def run_upload_job(self, payload: Dict, pool: Pool) -> Dict:    # job queue handler, owns the temp file
+        try:
+            document_id, duplicate = await self.upload_document(
+                payload["file_path"], pool, payload["content_hash"], payload.get("force", False)
+            )
+        except asyncio.CancelledError:
+            raise       # shutdown, the job is claimed again and still needs the file
+        except Exception:
+            remove_upload(Path(payload["file_path"]))      # job fails for good
+            raise
+        remove_upload(Path(payload["file_path"]))
+        return {"document_id": document_id, "filename": payload["filename"], "duplicate": duplicate}
\ No newline at end of file
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+import time
+
+class LRUCache:
+    """In-process LRU bounded by total size, with an optional TTL per entry."""
+
+    def __init__(self, max_size: int, sizeof: Callable[[Any], int] = lambda value: 1,
+                 ttl_seconds: float | None = None):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[Hashable, tuple] = OrderedDict()     # key -> (value, size, expires_at)
+        self.size = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, _, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            self.pop(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
+        self.pop(key)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        self.entries[key] = (value, size, expires_at)
+        self.size += size
+        while self.size > self.max_size:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def pop(self, key: Hashable) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "size": self.size, "max_size": self.max_size}
\ No newline at end of file
@@ -1,8 +1,11 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict
+import socket
 
 class Settings(BaseSettings):
     app_host: str = "localhost"
     app_port: int = 8000
+    server_timing_enabled: bool = False     # add a Server-Timing header with per-stage durations
 
     postgres_host: str = "localhost"
     postgres_port: int = 7790
@@ -12,11 +15,66 @@ class Settings(BaseSettings):
 
     pinecone_api_key: str
     pinecone_index: str ='compliguard-index'
+    vector_store_backends: Dict[str, str] = {"dpdp_act": "pinecone", "documents": "pinecone"}   # "pinecone" or "local"
+    local_vector_dir: str = 'data/vectors'
     
+    embedding_model: str = 'all-MiniLM-L6-v2'
+    embedding_dimension: int = 384
+    embedding_backend: str = "torch"        # "torch" (SentenceTransformer) or "onnx" (ONNX Runtime)
+    embedding_max_seq_length: int = 256     # tokens per text, same as the model's sentence-transformers config
+    onnx_model_dir: str = "data/onnx/all-MiniLM-L6-v2"     # exported on first use when missing
+    onnx_quantize: bool = True              # int8 dynamic quantization of the weights
+    onnx_threads: int = 0                   # ONNX Runtime intra-op threads, 0 lets it pick
+    embedding_max_batch_size: int = 64
+    embedding_max_wait_ms: float = 5.0
+    use_embedding_server: bool = False
+    embedding_socket_path: str = '/tmp/regulens-embedding.sock'
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_mb: int = 64
+    vector_upsert_batch_size: int = 100
+    vector_upsert_concurrency: int = 4
+    vector_upsert_retries: int = 3
+
     chunk_size: int= 1500
     chunk_overlap: int=  300
+    ingest_batch_size: int = 64
+
+    extraction_workers: int = 4
+    extraction_pages_per_task: int = 16
+    extraction_timeout_seconds: float = 120.0
+
+    upload_dir: str = 'temp'
+    upload_chunk_size: int = 1024 * 1024
+    max_upload_mb: int = 50
+
+    audit_mode: str = "single"      # "single" or "map_reduce"
+    retrieval_mode: str = "hybrid"          # "hybrid", "vector" or "lexical"
+    retrieval_top_k: int = 10
+    retrieval_min_score: float = 0.75       # cosine floor for hits the lexical search did not find
+    retrieval_rrf_k: int = 60
+    retrieval_vector_timeout_seconds: float = 2.0   # hybrid falls back to lexical-only after this
+    audit_segment_size: int = 10000
+    audit_segment_overlap: int = 500
+    audit_max_concurrency: int = 4
+    job_workers: int = 4
+    job_node: str = socket.gethostname()     # upload jobs run on the node holding their temp file
+    job_lease_seconds: float = 60.0     # a running job whose lease is not renewed is claimed again
+    job_poll_seconds: float = 2.0
 
     google_api_key: str
+    llm_model: str = "gemini-1.5-flash"
+    llm_requests_per_minute: int = 60       # shared by every request in this process
+    llm_tokens_per_minute: int = 1_000_000
+    llm_max_in_flight: int = 8
+    llm_output_tokens: int = 1024           # reserved from the token bucket per call
+    llm_max_retries: int = 4
+    llm_backoff_base_seconds: float = 2.0
+    llm_backoff_max_seconds: float = 60.0
+    prompt_token_budget: int = 8000         # document + DPDP Act text per Gemini call
+    prompt_document_share: float = 0.6      # share of the budget reserved for document text
+    audit_cache_enabled: bool = True
+    audit_cache_ttl_seconds: int = 7 * 24 * 3600
+    audit_cache_memory_entries: int = 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,78 @@
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from prometheus_client import Histogram, Counter, CONTENT_TYPE_LATEST, generate_latest
+from typing import List, Tuple, Iterator, AsyncIterator, Callable
+from asyncpg import Pool
+import time
+
+STAGE_SECONDS = Histogram(
+    "compliguard_stage_seconds", "Time spent per pipeline stage", ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+UPLOAD_CHUNKS = Histogram(
+    "compliguard_upload_chunks", "Chunks stored per uploaded document",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+)
+PROMPT_TOKENS = Histogram(
+    "compliguard_prompt_tokens", "Tokens per Gemini prompt",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+CACHE_LOOKUPS = Counter("compliguard_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+RETRIEVAL_FALLBACKS = Counter(
+    "compliguard_retrieval_fallbacks_total", "Hybrid retrievals that used one retriever only", ["failed"]
+)
+LLM_CALLS = Counter("compliguard_llm_calls_total", "Gemini calls by outcome", ["outcome"])
+POOL_WAIT_SECONDS = Histogram(
+    "compliguard_db_pool_wait_seconds", "Time waiting to acquire a database connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+)
+
+request_timings: ContextVar[List[Tuple[str, float]] | None] = ContextVar("request_timings", default=None)
+
+def record(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = request_timings.get()
+    if timings is not None:     # inside an HTTP request, reported in the Server-Timing header
+        timings.append((stage, seconds))
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+def timed_node(stage: str, node: Callable) -> Callable:     # LangGraph node wrapper
+    async def run(state):
+        with timed(f"node_{stage}"):
+            return await node(state)
+    return run
+
+def server_timing(timings: List[Tuple[str, float]]) -> str:
+    totals = {}
+    for stage, seconds in timings:      # stages that ran several times are summed
+        count, total = totals.get(stage, (0, 0.0))
+        totals[stage] = (count + 1, total + seconds)
+    return ", ".join(
+        f'{stage};dur={total * 1000:.1f};desc="{count}x"' for stage, (count, total) in totals.items()
+    )
+
+def render_metrics() -> Tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+class InstrumentedPool:
+    """asyncpg pool proxy that records how long acquire() waits for a free connection."""
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+    @asynccontextmanager
+    async def acquire(self, timeout: float | None = None) -> AsyncIterator:
+        start = time.perf_counter()
+        async with self.pool.acquire(timeout=timeout) as conn:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+            yield conn
\ No newline at end of file
@@ -0,0 +1,86 @@
+from fastapi import FastAPI
+from app.controllers.documents import DocumentController
+from app.services.embedding import EmbeddingService
+from app.services.llm import LLMService
+from app.usecase.compliance import build_compliance_graph
+from app.services.job_queue import JobQueue
+from app.services.extraction import shutdown_executor
+from app.services.regulation_corpus import RegulationCorpus
+from app.db.connection import get_listener_connection
+from app.core.config import settings
+from functools import partial
+from loguru import logger
+import asyncio
+
+async def warm_up_services(app: FastAPI) -> None:    # load model and build graph once per process
+    try:
+        embedding_service = await asyncio.to_thread(EmbeddingService)
+        if embedding_service.cache:
+            embedding_service.cache.attach_pool(app.state.db_pool)
+        await asyncio.to_thread(embedding_service.ensure_vector_stores)
+        await embedding_service.warm_up()
+        llm_service = LLMService()
+        if llm_service.cache:
+            llm_service.cache.attach_pool(app.state.db_pool)
+            await llm_service.cache.invalidate_stale()
+
+        regulation_corpus = RegulationCorpus()
+        await regulation_corpus.load(app.state.db_pool)
+        await regulation_corpus.listen(app.state.db_pool, get_listener_connection)
+
+        app.state.embedding_service = embedding_service
+        app.state.llm_service = llm_service
+        app.state.regulation_corpus = regulation_corpus
+        controller = DocumentController(
+            embedding_service=embedding_service,
+            llm_service=llm_service,
+            regulation_corpus=regulation_corpus,
+            compliance_graph=build_compliance_graph()
+        )
+        app.state.controller = controller
+        app.state.job_queue = JobQueue(
+            app.state.db_pool,
+            handlers={
+                "audit": partial(controller.run_audit_job, pool=app.state.db_pool),
+                "upload": partial(controller.run_upload_job, pool=app.state.db_pool)
+            },
+            workers=settings.job_workers,
+            node=settings.job_node,
+            lease_seconds=settings.job_lease_seconds,
+            poll_seconds=settings.job_poll_seconds
+        )
+        await app.state.job_queue.start()
+        app.state.ready = True
+        logger.info('Services warmed up, API is ready')
+    except Exception as e:
+        app.state.warmup_error = str(e)
+        logger.error(f'Failed to warm up services: {e}')
+
+def init_services(app: FastAPI) -> None:
+    app.state.ready = False
+    app.state.warmup_error = None
+    app.state.warmup_task = asyncio.create_task(warm_up_services(app))    # serve /ready while model loads
+
+async def close_services(app: FastAPI) -> None:
+    task = getattr(app.state, 'warmup_task', None)
+    if task and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    app.state.ready = False
+    job_queue = getattr(app.state, 'job_queue', None)
+    if job_queue:
+        await job_queue.close()
+    regulation_corpus = getattr(app.state, 'regulation_corpus', None)
+    if regulation_corpus:
+        await regulation_corpus.close()
+    embedding_service = getattr(app.state, 'embedding_service', None)
+    if embedding_service:
+        await embedding_service.close()
+    shutdown_executor()
+    logger.info('Services shut down.')
+
+def is_ready(app: FastAPI) -> bool:
+    return bool(getattr(app.state, 'ready', False))
\ No newline at end of file
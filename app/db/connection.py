@@ -1,6 +1,7 @@
 from fastapi import FastAPI
-from asyncpg import Pool, create_pool
+from asyncpg import Pool, Connection, create_pool, connect
 from app.core.config import settings
+from app.core.metrics import InstrumentedPool
 from loguru import logger
 
 async def get_db_pool() -> Pool:
@@ -18,12 +19,21 @@ async def get_db_pool() -> Pool:
             await conn.execute('SELECT 1')
         logger.info('Database Connection POOl created')
         
-        return pool
+        return InstrumentedPool(pool)     # records connection acquire waits
     except Exception as e:
         logger.error(f'Failed to Connect Daabase: {e}')
         raise
     
     
+async def get_listener_connection() -> Connection:      # dedicated connection for LISTEN, outside the pool
+    return await connect(
+        user= settings.postgres_user,
+        password= settings.postgres_password,
+        database= settings.postgres_db,
+        host= settings.postgres_host,
+        port= settings.postgres_port
+    )
+
 async def init_db(app: FastAPI) -> None:
     app.state.db_pool= await get_db_pool()  #initialize db connection pool for FastAPI App
     
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, LargeBinary, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -14,16 +15,37 @@ class DPDPAct(Base):
     content = Column(Text, nullable=False)
     is_chunk = Column(Boolean, default=False)
     chunk_index = Column(Integer, nullable=True)
+    content_hash = Column(String(64))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (      # ingest upserts on these keys
+        Index('ux_dpdp_act_section', 'section_number', unique=True, postgresql_where=text('NOT is_chunk')),
+        Index('ux_dpdp_act_chunk', 'section_number', 'chunk_index', unique=True, postgresql_where=text('is_chunk')),
+        Index('ix_dpdp_act_content_tsv', text("to_tsvector('english', content)"),       # lexical retrieval
+              postgresql_using='gin', postgresql_where=text('is_chunk')),
+    )
+
 class Document(Base):
     
     __tablename__ = 'documents'
     id = Column(Integer, primary_key=True)
     filename = Column(String(255), nullable=False)
+    content_hash = Column(String(64), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DocumentChunk(Base):
+    
+    __tablename__ = 'document_chunks'
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
     chunk_text = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ux_document_chunks_document_chunk', 'document_id', 'chunk_index', unique=True),
+    )
+
 class Audit(Base):
     
     __tablename__ = "audits"
@@ -33,4 +55,43 @@ class Audit(Base):
     compliance_status = Column(Boolean)
     gaps = Column(Text)
     suggestions = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (      # keyset pagination of the audit history, newest first
+        Index('ix_audits_document_created', 'document_id', 'created_at', 'id'),
+        Index('ix_audits_status_created', 'compliance_status', 'created_at', 'id'),
+        Index('ix_audits_created', 'created_at', 'id'),
+    )
+
+class EmbeddingCache(Base):
+    
+    __tablename__ = "embedding_cache"
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class AuditCache(Base):
+    
+    __tablename__ = "audit_cache"
+    cache_key = Column(String(64), primary_key=True)
+    prompt_version = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    result = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class Job(Base):
+    
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, index=True)
+    result = Column(JSONB)
+    error = Column(Text)
+    node = Column(String(255))
+    lease_expires_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -1,26 +1,71 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from typing import Dict, Any, AsyncContextManager
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.db.connection import init_db, closed_db
+from app.core.services import init_services, close_services, is_ready
+from app.core.metrics import request_timings, server_timing, render_metrics
 from app.routers.document import router as document_router
+from app.routers.audits import router as audits_router
 
 import uvicorn
 
 async def lifespan(app: FastAPI) -> AsyncContextManager:   # Manage fastapi app lifecycle
     await init_db(app)
+    init_services(app)
     yield
+    await close_services(app)
     await closed_db(app)                
 
 app = FastAPI(title="CompliGuard: DPDP Compliance Auditor", lifespan=lifespan)
 
 setup_logging()
 app.include_router(document_router)
+app.include_router(audits_router)
+
+@app.middleware("http")
+async def timing_header(request: Request, call_next):     # per-request stage durations, opt-in
+    if not settings.server_timing_enabled:
+        return await call_next(request)
+    timings = []
+    token = request_timings.set(timings)
+    try:
+        response = await call_next(request)
+    finally:
+        request_timings.reset(token)
+    if timings:
+        response.headers["Server-Timing"] = server_timing(timings)
+    return response
 
 @app.get("/", response_model=Dict[str, str])
 async def root() -> Dict[str, Any]:
     return {"message": "CompliGuard API is running"}   # API Endpoint
 
+@app.get("/ready", response_model=Dict[str, str])
+async def ready() -> Dict[str, Any]:      # readiness probe, ok only once the embedding model is loaded
+    if not is_ready(app):
+        detail = app.state.warmup_error or "Services are warming up"
+        raise HTTPException(status_code=503, detail=detail)
+    return {"status": "ready"}
+
+@app.get("/stats", response_model=Dict[str, Any])
+async def stats() -> Dict[str, Any]:      # cache and LLM queue counters for dashboards
+    if not is_ready(app):
+        raise HTTPException(status_code=503, detail="Services are warming up")
+    embedding_cache = app.state.embedding_service.cache
+    audit_cache = app.state.llm_service.cache
+    return {
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "audit_cache": audit_cache.stats() if audit_cache else None,
+        "llm_limiter": app.state.llm_service.limiter.stats(),
+        "prompt_packer": app.state.llm_service.packer.stats()
+    }
+
+@app.get("/metrics")
+async def metrics() -> Response:      # Prometheus scrape endpoint
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
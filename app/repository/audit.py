@@ -0,0 +1,47 @@
+from asyncpg import Pool
+from datetime import datetime
+from typing import List, Dict, Tuple
+
+SUMMARY_COLUMNS = "id, document_id, compliance_status, dpdp_section, created_at"
+FULL_COLUMNS = SUMMARY_COLUMNS + ", gaps, suggestions"
+
+async def fetch_audits(pool: Pool, limit: int, document_id: int | None = None, compliance_status: bool | None = None,
+                       created_after: datetime | None = None, created_before: datetime | None = None,
+                       cursor: Tuple[datetime, int] | None = None, summary: bool = False) -> List[Dict]:
+    # newest first; the keyset (created_at, id) < cursor walks ix_audits_* without OFFSET scans
+    conditions, params = [], []
+
+    def param(value) -> str:
+        params.append(value)
+        return f"${len(params)}"
+
+    if document_id is not None:
+        conditions.append(f"document_id = {param(document_id)}")
+    if compliance_status is not None:
+        conditions.append(f"compliance_status = {param(compliance_status)}")
+    if created_after is not None:
+        conditions.append(f"created_at >= {param(created_after)}")
+    if created_before is not None:
+        conditions.append(f"created_at < {param(created_before)}")
+    if cursor is not None:
+        conditions.append(f"(created_at, id) < ({param(cursor[0])}, {param(cursor[1])})")
+    query = f"""
+            SELECT {SUMMARY_COLUMNS if summary else FULL_COLUMNS} FROM audits
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY created_at DESC, id DESC
+            LIMIT {param(limit)}
+            """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, *params)
+        return [dict(row) for row in rows]
+
+async def fetch_latest_audit(pool: Pool, document_id: int, summary: bool = False) -> Dict | None:
+    query = f"""
+            SELECT {SUMMARY_COLUMNS if summary else FULL_COLUMNS} FROM audits
+            WHERE document_id = $1
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+            """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(query, document_id)
+        return dict(row) if row else None
\ No newline at end of file
@@ -0,0 +1,33 @@
+from asyncpg import Pool
+from loguru import logger
+from typing import Dict
+import json
+
+async def fetch_cached_audit(pool: Pool, cache_key: str) -> Dict | None:
+    query = """
+        SELECT result FROM audit_cache WHERE cache_key = $1 AND expires_at > NOW()
+    """
+    async with pool.acquire() as conn:
+        result = await conn.fetchval(query, cache_key)
+        return json.loads(result) if result else None
+
+async def upsert_cached_audit(pool: Pool, cache_key: str, prompt_version: str, model: str,
+                              result: Dict, ttl_seconds: int) -> None:
+    query = """
+        INSERT INTO audit_cache (cache_key, prompt_version, model, result, expires_at)
+        VALUES ($1, $2, $3, $4::jsonb, NOW() + make_interval(secs => $5))
+        ON CONFLICT (cache_key) DO UPDATE
+        SET result = EXCLUDED.result, created_at = NOW(), expires_at = EXCLUDED.expires_at
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(query, cache_key, prompt_version, model, json.dumps(result), float(ttl_seconds))
+
+async def delete_stale_audits(pool: Pool, prompt_version: str, model: str) -> int:
+    query = """
+        DELETE FROM audit_cache WHERE prompt_version <> $1 OR model <> $2 OR expires_at <= NOW()
+    """
+    async with pool.acquire() as conn:
+        status = await conn.execute(query, prompt_version, model)
+        deleted = int(status.split()[-1])
+        logger.debug(f"Deleted {deleted} stale cached audits")
+        return deleted
\ No newline at end of file
@@ -1,39 +1,175 @@
-from asyncpg import Pool
+from asyncpg import Pool, Connection
 from loguru import logger
 from typing import List, Dict
 from datetime import datetime
 
-async def insert_dpdp_act( pool: Pool, section_number: str, section_title: str, chapter: str,
-                            content: str, is_chunk: bool, chunk_index: int | None ) -> int:
+async def reserve_ids(conn: Connection, table: str, count: int) -> List[int]:    # ids in insert order for COPY
+    query = f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) AS id FROM generate_series(1, $1)"
+    rows = await conn.fetch(query, count)
+    return sorted(row["id"] for row in rows)
+
+async def fetch_dpdp_act_index(pool: Pool) -> List[Dict]:      # keys and hashes only, for ingest diffing
     query = """
-        INSERT INTO dpdp_act (section_number, section_title, chapter, content, is_chunk, chunk_index)
-        VALUES ($1, $2, $3, $4, $5, $6)
-        RETURNING id
+            SELECT id, section_number, is_chunk, chunk_index, content_hash FROM dpdp_act
+            """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query)
+        return [dict(row) for row in rows]
+
+async def upsert_dpdp_section(pool: Pool, section_number: str, section_title: str, chapter: str, content: str,
+                              chunks: List[Dict], removed_chunk_indexes: List[int]) -> Dict[int, int]:
+    # rows are written with a NULL hash, set by mark_dpdp_sections_embedded once their vectors are stored,
+    # so an ingest that fails half way is picked up again by the next run's diff
+    section_query = """
+        INSERT INTO dpdp_act (section_number, section_title, chapter, content, is_chunk, chunk_index, content_hash)
+        VALUES ($1, $2, $3, $4, FALSE, NULL, NULL)
+        ON CONFLICT (section_number) WHERE NOT is_chunk DO UPDATE
+        SET section_title = EXCLUDED.section_title, chapter = EXCLUDED.chapter,
+            content = EXCLUDED.content, content_hash = NULL
+    """
+    chunk_query = """
+        INSERT INTO dpdp_act (section_number, section_title, chapter, content, is_chunk, chunk_index, content_hash)
+        SELECT $1, $2, $3, t.content, TRUE, t.chunk_index, NULL
+        FROM unnest($4::text[], $5::int[]) AS t(content, chunk_index)
+        ON CONFLICT (section_number, chunk_index) WHERE is_chunk DO UPDATE
+        SET section_title = EXCLUDED.section_title, chapter = EXCLUDED.chapter,
+            content = EXCLUDED.content, content_hash = NULL
+        RETURNING id, chunk_index
+    """
+    delete_query = """
+        DELETE FROM dpdp_act WHERE section_number = $1 AND is_chunk AND chunk_index = ANY($2::int[])
     """
     async with pool.acquire() as conn:
-        section_id = await conn.fetchval(
-            query, section_number, section_title, chapter, content, is_chunk, chunk_index
-        )
-        logger.debug(f"Inserted DPDP Act section {section_number} with ID: {section_id}")
-        return section_id
+        async with conn.transaction():      # section row, changed chunks and removed chunks together
+            await conn.execute(section_query, section_number, section_title, chapter, content)
+            rows = await conn.fetch(
+                chunk_query, section_number, section_title, chapter,
+                [chunk["content"] for chunk in chunks], [chunk["chunk_index"] for chunk in chunks]
+            ) if chunks else []
+            if removed_chunk_indexes:
+                await conn.execute(delete_query, section_number, removed_chunk_indexes)
+        logger.debug(f"Upserted DPDP Act section {section_number} with {len(rows)} chunks")
+        return {row["chunk_index"]: row["id"] for row in rows}
+
+async def mark_dpdp_sections_embedded(pool: Pool, sections: List[Dict]) -> None:
+    # sections: {"section_number", "content_hash", "chunks": [{"chunk_index", "content_hash"}]}
+    section_query = """
+        UPDATE dpdp_act SET content_hash = t.content_hash
+        FROM unnest($1::text[], $2::text[]) AS t(section_number, content_hash)
+        WHERE NOT dpdp_act.is_chunk AND dpdp_act.section_number = t.section_number
+    """
+    chunk_query = """
+        UPDATE dpdp_act SET content_hash = t.content_hash
+        FROM unnest($1::text[], $2::int[], $3::text[]) AS t(section_number, chunk_index, content_hash)
+        WHERE dpdp_act.is_chunk AND dpdp_act.section_number = t.section_number AND dpdp_act.chunk_index = t.chunk_index
+    """
+    chunks = [(section["section_number"], chunk) for section in sections for chunk in section["chunks"]]
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                section_query, [s["section_number"] for s in sections], [s["content_hash"] for s in sections]
+            )
+            await conn.execute(
+                chunk_query, [number for number, _ in chunks], [chunk["chunk_index"] for _, chunk in chunks],
+                [chunk["content_hash"] for _, chunk in chunks]
+            )
+        logger.debug(f"Marked {len(sections)} DPDP Act sections as embedded")
+
+async def delete_dpdp_sections(pool: Pool, section_numbers: List[str]) -> None:
+    query = """
+        DELETE FROM dpdp_act WHERE section_number = ANY($1::text[])
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(query, section_numbers)
+        logger.debug(f"Deleted DPDP Act sections: {section_numbers}")
 
-async def insert_document(pool: Pool, filename: str, chunk_text: str) -> int:
+async def fetch_dpdp_act(pool: Pool) -> List[Dict]:
+    query = """
+            SELECT id, section_number, section_title, chapter, content, is_chunk, chunk_index
+            FROM dpdp_act ORDER BY id
+            """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query)
+        return [dict(row) for row in rows]
 
+async def search_dpdp_chunks(pool: Pool, query_text: str, limit: int) -> List[Dict]:
+    # OR of every stemmed lexeme in the text (the ::text round trip quotes them), ranked by cover density;
+    # the predicate matches ix_dpdp_act_content_tsv
     query = """
-        INSERT INTO documents (filename, chunk_text)
-        VALUES ($1, $2)
+            WITH q AS (
+                SELECT string_agg(plainto_tsquery('simple', lexeme)::text, ' | ')::tsquery AS query
+                FROM unnest(to_tsvector('english', $1))
+            )
+            SELECT d.id, d.section_number, ts_rank_cd(to_tsvector('english', d.content), q.query, 1) AS rank
+            FROM dpdp_act d, q
+            WHERE d.is_chunk AND to_tsvector('english', d.content) @@ q.query
+            ORDER BY rank DESC
+            LIMIT $2
+            """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, query_text, limit)
+        return [dict(row) for row in rows]
+
+async def notify_dpdp_act_changed(pool: Pool) -> None:     # tells running APIs to reload their corpus
+    async with pool.acquire() as conn:
+        await conn.execute("NOTIFY dpdp_act_changed")
+
+async def insert_document(pool: Pool, filename: str) -> int:
+    query = """
+        INSERT INTO documents (filename)
+        VALUES ($1)
         RETURNING id
     """
     async with pool.acquire() as conn:
-        document_id = await conn.fetchval(query, filename, chunk_text)
-        logger.debug(f"Inserted document chunk for {filename} with ID: {document_id}")
+        document_id = await conn.fetchval(query, filename)
+        logger.debug(f"Inserted document {filename} with ID: {document_id}")
         return document_id
 
+async def set_document_hash(pool: Pool, document_id: int, content_hash: str) -> None:
+    query = """
+        UPDATE documents SET content_hash = $2 WHERE id = $1
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(query, document_id, content_hash)
+
+async def insert_document_chunks(pool: Pool, document_id: int, first_index: int, chunks: List[str]) -> List[int]:
+    if not chunks:
+        return []
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            ids = await reserve_ids(conn, "document_chunks", len(chunks))
+            await conn.copy_records_to_table(
+                "document_chunks",
+                records=[
+                    (chunk_id, document_id, idx, chunk)
+                    for idx, (chunk_id, chunk) in enumerate(zip(ids, chunks), first_index)
+                ],
+                columns=["id", "document_id", "chunk_index", "chunk_text"]
+            )
+        logger.debug(f"Inserted {len(ids)} chunks for document_id: {document_id}")
+        return ids
+
+async def delete_document(pool: Pool, document_id: int) -> None:     # chunks go with it (ON DELETE CASCADE)
+    query = """
+        DELETE FROM documents WHERE id = $1
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(query, document_id)
+        logger.debug(f"Deleted document_id: {document_id}")
+
+async def fetch_document_id_by_hash(pool: Pool, content_hash: str) -> int | None:    # newest, a forced reprocess supersedes older copies
+    query = """
+            SELECT id FROM documents WHERE content_hash = $1 ORDER BY id DESC LIMIT 1
+            """
+    async with pool.acquire() as conn:
+        return await conn.fetchval(query, content_hash)
+
 async def insert_audit( pool: Pool, document_id: int, dpdp_section: str, compliance_status: bool,
                         gaps: str, suggestions: str ) -> None:
+    # created_at is written in UTC whatever the server time zone, the audit history filters compare in UTC
     query = """
-        INSERT INTO audits (document_id, dpdp_section, compliance_status, gaps, suggestions)
-        VALUES ($1, $2, $3, $4, $5)
+        INSERT INTO audits (document_id, dpdp_section, compliance_status, gaps, suggestions, created_at)
+        VALUES ($1, $2, $3, $4, $5, NOW() AT TIME ZONE 'UTC')
     """
     async with pool.acquire() as conn:
         await conn.execute(
@@ -42,9 +178,12 @@ async def insert_audit( pool: Pool, document_id: int, dpdp_section: str, complia
         logger.debug(f"Inserted audit for document_id: {document_id}")
 
 async def fetch_document_chunks(pool: Pool, document_id: int) -> List[Dict]:
-    
+    # ordered by the (document_id, chunk_index) index, one round trip for filename and every chunk
     query = """
-            SELECT id, filename, chunk_text FROM documents WHERE id = $1
+            SELECT c.id, d.filename, c.chunk_index, c.chunk_text
+            FROM document_chunks c JOIN documents d ON d.id = c.document_id
+            WHERE c.document_id = $1
+            ORDER BY c.chunk_index
             """
     async with pool.acquire() as conn:
         rows = await conn.fetch(query, document_id)
@@ -55,6 +194,7 @@ async def fetch_document_chunks(pool: Pool, document_id: int) -> List[Dict]:
             { 
                 "id": row["id"], 
                 "filename": row["filename"], 
+                "chunk_index": row["chunk_index"],
                 "chunk_text": row["chunk_text"]
             }
             for row in rows
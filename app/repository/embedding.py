@@ -0,0 +1,23 @@
+from asyncpg import Pool
+from loguru import logger
+from typing import List, Dict, Tuple
+
+async def fetch_cached_embeddings(pool: Pool, cache_keys: List[str]) -> Dict[str, Tuple[int, bytes]]:
+    query = """
+        SELECT cache_key, dim, vector FROM embedding_cache WHERE cache_key = ANY($1::text[])
+    """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, cache_keys)
+        return {row["cache_key"]: (row["dim"], row["vector"]) for row in rows}
+
+async def insert_cached_embeddings(pool: Pool, model: str, rows: List[Tuple[str, int, bytes]]) -> None:
+    query = """
+        INSERT INTO embedding_cache (cache_key, model, dim, vector)
+        SELECT key, $1, dim, vector FROM unnest($2::text[], $3::int[], $4::bytea[]) AS t(key, dim, vector)
+        ON CONFLICT (cache_key) DO NOTHING
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(
+            query, model, [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+        )
+        logger.debug(f"Cached {len(rows)} embeddings for {model}")
\ No newline at end of file
@@ -0,0 +1,70 @@
+from asyncpg import Pool
+from loguru import logger
+from typing import Dict
+import json
+
+def _job_from_row(row) -> Dict:
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "payload": json.loads(row["payload"]),
+        "status": row["status"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"]
+    }
+
+async def insert_job(pool: Pool, kind: str, payload: Dict, node: str | None = None) -> int:    # node: only it may claim the job
+    query = """
+        INSERT INTO jobs (kind, payload, status, node)
+        VALUES ($1, $2::jsonb, 'queued', $3)
+        RETURNING id
+    """
+    async with pool.acquire() as conn:
+        job_id = await conn.fetchval(query, kind, json.dumps(payload), node)
+        logger.debug(f"Inserted {kind} job with ID: {job_id}")
+        return job_id
+
+async def update_job(pool: Pool, job_id: int, status: str, result: Dict | None = None, error: str | None = None) -> None:
+    query = """
+        UPDATE jobs SET status = $2, result = $3::jsonb, error = $4, lease_expires_at = NULL, updated_at = NOW()
+        WHERE id = $1
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(query, job_id, status, json.dumps(result) if result is not None else None, error)
+
+async def claim_job(pool: Pool, node: str, lease_seconds: float) -> Dict | None:
+    # oldest queued job, or a running one whose worker stopped renewing its lease; SKIP LOCKED keeps
+    # concurrent workers, in this process or another, from claiming the same row
+    query = """
+        UPDATE jobs SET status = 'running', lease_expires_at = NOW() + make_interval(secs => $1), updated_at = NOW()
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE (node IS NULL OR node = $2)
+              AND (status = 'queued' OR (status = 'running' AND lease_expires_at < NOW()))
+            ORDER BY id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, kind, payload, status, result, error, created_at, updated_at
+    """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(query, lease_seconds, node)
+        return _job_from_row(row) if row else None
+
+async def renew_job_lease(pool: Pool, job_id: int, lease_seconds: float) -> None:
+    query = """
+        UPDATE jobs SET lease_expires_at = NOW() + make_interval(secs => $2)
+        WHERE id = $1 AND status = 'running'
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(query, job_id, lease_seconds)
+
+async def fetch_job(pool: Pool, job_id: int) -> Dict | None:
+    query = """
+            SELECT id, kind, payload, status, result, error, created_at, updated_at FROM jobs WHERE id = $1
+            """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(query, job_id)
+        return _job_from_row(row) if row else None
\ No newline at end of file
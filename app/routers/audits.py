@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Request, HTTPException, Depends, Query
+from pydantic import BaseModel
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Literal, Tuple
+from app.controllers.documents import DocumentController
+from app.repository.job import fetch_job
+from app.repository.audit import fetch_audits, fetch_latest_audit
+from app.routers.document import get_controller, JobResponse
+import base64
+import json
+
+router= APIRouter(prefix='/audits', tags=['Audits'])
+
+class AuditJobRequest(BaseModel):
+    document_id: int
+
+class JobStatusResponse(BaseModel):
+    job_id: int
+    kind: str
+    status: str
+    result: Dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+class AuditRecord(BaseModel):
+    id: int
+    document_id: int
+    compliance_status: bool
+    dpdp_section: str | None
+    created_at: datetime
+    gaps: str | None = None             # left out with fields=summary
+    suggestions: str | None = None
+
+class AuditPage(BaseModel):
+    items: List[AuditRecord]
+    next_cursor: str | None
+
+def encode_cursor(audit: Dict) -> str:      # opaque to clients, position of the last item in the page
+    raw = json.dumps({"created_at": audit["created_at"].isoformat(), "id": audit["id"]})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(raw["created_at"]), int(raw["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def naive_utc(value: datetime | None) -> datetime | None:     # audits.created_at is TIMESTAMP without time zone
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+@router.get('', response_model= AuditPage, response_model_exclude_unset=True)
+async def list_audits(request: Request, document_id: int | None = None, compliance_status: bool | None = None,
+                      created_after: datetime | None = None, created_before: datetime | None = None,
+                      cursor: str | None = None, limit: int = Query(50, ge=1, le=200),
+                      fields: Literal["full", "summary"] = "full") -> AuditPage:
+    rows = await fetch_audits(
+        request.app.state.db_pool, limit + 1, document_id=document_id, compliance_status=compliance_status,
+        created_after=naive_utc(created_after), created_before=naive_utc(created_before),
+        cursor=decode_cursor(cursor) if cursor else None, summary=fields == "summary"
+    )
+    items = rows[:limit]        # one extra row tells whether another page exists
+    return AuditPage(
+        items= [AuditRecord(**row) for row in items],
+        next_cursor= encode_cursor(items[-1]) if len(rows) > limit else None
+    )
+
+@router.get('/documents/{document_id}/latest', response_model= AuditRecord, response_model_exclude_unset=True)
+async def latest_audit(document_id: int, request: Request,
+                       fields: Literal["full", "summary"] = "full") -> AuditRecord:
+    audit = await fetch_latest_audit(request.app.state.db_pool, document_id, summary=fields == "summary")
+    if not audit:
+        raise HTTPException(status_code=404, detail=f"No audit found for document_id: {document_id}")
+    return AuditRecord(**audit)
+
+@router.post('/jobs', response_model= JobResponse, status_code=202)
+async def submit_audit_job(body: AuditJobRequest, request: Request,
+                           controller: DocumentController = Depends(get_controller)) -> JobResponse:
+    job_id = await request.app.state.job_queue.submit("audit", {"document_id": body.document_id})
+    return JobResponse(job_id= job_id, status= "queued")
+
+@router.get('/jobs/{job_id}', response_model= JobStatusResponse)
+async def get_job(job_id: int, request: Request) -> JobStatusResponse:
+    job = await fetch_job(request.app.state.db_pool, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobStatusResponse(
+        job_id= job["id"],
+        kind= job["kind"],
+        status= job["status"],
+        result= job["result"],
+        error= job["error"],
+        created_at= job["created_at"],
+        updated_at= job["updated_at"]
+    )
\ No newline at end of file
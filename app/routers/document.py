@@ -1,17 +1,20 @@
-from fastapi import APIRouter, UploadFile, Request, HTTPException
+from fastapi import APIRouter, UploadFile, Request, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Tuple
 from app.controllers.documents import DocumentController
-from app.services.embedding import EmbeddingService
-from app.services.llm import LLMService
+from app.core.services import is_ready
+from app.services.upload import save_upload, remove_upload, UploadTooLargeError
+from contextlib import aclosing
 from pathlib import Path
-import aiofiles
+import json
 
 router= APIRouter(prefix='/documents', tags=['Documents'])
 
 class UploadResponse(BaseModel):
-    document_ids: List[int]
+    document_id: int
     filename: str
+    duplicate: bool = False
     
 class AuditResponse(BaseModel):
     document_id: int
@@ -21,32 +24,98 @@ class AuditResponse(BaseModel):
     compliance_gaps: str
     recommendations: str
 
-def get_controller(request: Request) -> DocumentController:
-    return DocumentController(
-        embedding_service= EmbeddingService(),
-        llm_service= LLMService()
-    )
-    
-@router.post('/upload', response_model= UploadResponse)
-async def upload_doc(file: UploadFile, request: Request) -> UploadResponse:
-    allowed_types = {"application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
-    
-    if file.content_type not in allowed_types:
+class BatchAuditRequest(BaseModel):
+    document_ids: List[int]
+
+class BatchAuditError(BaseModel):
+    document_id: int
+    error: str
+
+class BatchAuditResponse(BaseModel):
+    results: List[AuditResponse]
+    errors: List[BatchAuditError]
+
+class JobResponse(BaseModel):
+    job_id: int
+    status: str
+
+ALLOWED_TYPES = {"application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
+
+def get_controller(request: Request) -> DocumentController:     # shared controller built at startup
+    if not is_ready(request.app):
+        raise HTTPException(status_code=503, detail="Service is warming up, retry shortly")
+    return request.app.state.controller
+
+async def receive_upload(file: UploadFile) -> Tuple[Path, str]:
+    if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(status_code=400, detail="Only PDF or DOCX files allowed")
+    try:
+        return await save_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    temp_dir=Path('temp')
-    temp_dir.mkdir(exist_ok=True)
-    temp_path = temp_dir / file.filename
-    
-    async with aiofiles.open(temp_path, 'wb') as f:
-        await f.write(await file.read())
-        
-    controller= get_controller(request)
-    document_ids = await controller.upload_document(str(temp_path), request.app.state.db_pool)
-    return UploadResponse(document_ids= document_ids, filename= file.filename)
+@router.post('/upload', response_model= UploadResponse)
+async def upload_doc(file: UploadFile, request: Request, force: bool = False,
+                     controller: DocumentController = Depends(get_controller)) -> UploadResponse:
+    temp_path, content_hash = await receive_upload(file)    # identical uploads reuse stored chunks unless force=true
+    try:
+        document_id, duplicate = await controller.upload_document(
+            str(temp_path), request.app.state.db_pool, content_hash, force
+        )
+    finally:
+        remove_upload(temp_path)
+    return UploadResponse(document_id= document_id, filename= file.filename, duplicate= duplicate)
+
+@router.post("/audit/batch", response_model=BatchAuditResponse)
+async def audit_batch(body: BatchAuditRequest, request: Request, stream: bool = False,
+                      controller: DocumentController = Depends(get_controller)):
+    document_ids = list(dict.fromkeys(body.document_ids))
+    if not document_ids:
+        raise HTTPException(status_code=400, detail="document_ids must not be empty")
+    results = controller.audit_documents(document_ids, request.app.state.db_pool)
+
+    if stream:      # one JSON line per document as soon as its audit finishes
+        async def ndjson():
+            async with aclosing(results):       # client disconnect closes the batch and cancels its audits
+                async for result in results:
+                    yield json.dumps(result) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    response = BatchAuditResponse(results=[], errors=[])
+    async for result in results:
+        if "error" in result:
+            response.errors.append(BatchAuditError(**result))
+        else:
+            response.results.append(AuditResponse(**result))
+    return response
 
 @router.post("/audit/{document_id}", response_model=AuditResponse)
-async def audit_document(document_id: int, request: Request) -> AuditResponse:
-    controller = get_controller(request)
+async def audit_document(document_id: int, request: Request,
+                         controller: DocumentController = Depends(get_controller)) -> AuditResponse:
     result = await controller.audit_document(document_id, request.app.state.db_pool)
-    return AuditResponse(**result)
\ No newline at end of file
+    return AuditResponse(**result)
+
+@router.get("/audit/{document_id}/stream")
+async def stream_audit(document_id: int, request: Request,
+                       controller: DocumentController = Depends(get_controller)) -> StreamingResponse:
+    async def sse():        # server-sent events: stage updates, LLM tokens, then the AuditResponse
+        async for event in controller.stream_audit(document_id, request.app.state.db_pool):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    return StreamingResponse(sse(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post('/upload/jobs', response_model= JobResponse, status_code=202)
+async def submit_upload_job(file: UploadFile, request: Request, force: bool = False,
+                            controller: DocumentController = Depends(get_controller)) -> JobResponse:
+    temp_path, content_hash = await receive_upload(file)    # kept until the job has processed it
+    try:
+        job_id = await request.app.state.job_queue.submit("upload", {
+            "file_path": str(temp_path),
+            "filename": file.filename,
+            "content_hash": content_hash,
+            "force": force
+        }, local=True)      # the temp file only exists on this host
+    except Exception:
+        remove_upload(temp_path)
+        raise
+    return JobResponse(job_id= job_id, status= "queued")
\ No newline at end of file
@@ -0,0 +1,67 @@
+from asyncpg import Pool
+from app.core.cache import LRUCache
+from app.core.metrics import CACHE_LOOKUPS
+from app.repository.audit_cache import fetch_cached_audit, upsert_cached_audit, delete_stale_audits
+from loguru import logger
+from typing import Dict
+import hashlib
+
+class AuditCache:
+    """LLM audit results keyed by inputs, prompt version and model: in-process LRU over a Postgres table."""
+
+    def __init__(self, prompt_version: str, model: str, ttl_seconds: int, max_entries: int):
+        self.prompt_version = prompt_version
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(max_size=max_entries, ttl_seconds=ttl_seconds)
+        self.pool: Pool | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def attach_pool(self, pool: Pool) -> None:
+        self.pool = pool
+
+    def key(self, document_text: str, regulation_text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.prompt_version, self.model, document_text, regulation_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Dict | None:
+        result = self.memory.get(key)
+        if result is None and self.pool:
+            try:
+                result = await fetch_cached_audit(self.pool, key)
+            except Exception as e:
+                logger.warning(f"Audit cache lookup failed: {e}")
+            if result is not None:
+                self.memory.set(key, result)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        CACHE_LOOKUPS.labels("audit", "miss" if result is None else "hit").inc()
+        return result
+
+    async def set(self, key: str, result: Dict) -> None:
+        self.memory.set(key, result)
+        if not self.pool:
+            return
+        try:
+            await upsert_cached_audit(self.pool, key, self.prompt_version, self.model, result, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to persist audit result: {e}")
+
+    async def invalidate_stale(self) -> None:   # drop rows written by another prompt version or model
+        self.memory.clear()
+        if self.pool:
+            deleted = await delete_stale_audits(self.pool, self.prompt_version, self.model)
+            logger.info(f"Invalidated {deleted} cached audits from older prompt/model versions")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            **{f"memory_{name}": value for name, value in self.memory.stats().items()}
+        }
\ No newline at end of file
@@ -1,182 +1,334 @@
 import re
-import fitz
-from docx import Document
 from pathlib import Path
 import aiofiles
 import asyncio
+import hashlib
 from asyncpg import Pool
 from loguru import logger
-from typing import AsyncGenerator, TypedDict, List, Dict
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import AsyncGenerator, TypedDict, List, Dict, TYPE_CHECKING
 
-from app.repository.document import insert_dpdp_act, insert_document
+from app.repository.document import (
+    insert_document, insert_document_chunks, delete_document, set_document_hash, fetch_dpdp_act_index, upsert_dpdp_section,
+    delete_dpdp_sections, notify_dpdp_act_changed, mark_dpdp_sections_embedded
+)
 from app.core.config import settings
-from app.services.embedding import embedding_service
+from app.core.metrics import timed, UPLOAD_CHUNKS
+from app.services.embedding import EmbeddingService
+from app.services.extraction import iter_document_text
 
-class SectionData(TypedDict):
+if TYPE_CHECKING:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+class ParsedChunk(TypedDict):
+    chunk_index: int
+    content: str
+    content_hash: str
+
+class ParsedSection(TypedDict):
     number: str
     title: str
-    content: List[str]
-    
+    chapter: str
+    content: str
+    content_hash: str
+    chunks: List[ParsedChunk]
+
+class SectionChange(TypedDict):
+    section: ParsedSection
+    status: str                         # "added" or "changed"
+    changed_chunks: List[ParsedChunk]   # new or edited chunks, re-embedded
+    removed_chunk_indexes: List[int]
+    removed_chunk_ids: List[int]
+
+class IngestPlan(TypedDict):
+    changes: List[SectionChange]
+    removed_sections: List[str]
+    removed_section_chunk_ids: List[int]
+    unchanged: int
+
 async def read_file(file_path: str) -> AsyncGenerator[str, None]:       # Stream lines from file
     async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
         async for line in f:
             yield line.strip()
-            
-async def validate_section(section: SectionData) -> bool:       #validate section data 
-    return bool(section['number'] and section['content'])
 
-async def store_section(pool: Pool, chapter: str, section: SectionData, content_lines: List[str], 
-                        splitter: RecursiveCharacterTextSplitter, batch_vectors: List[Dict]) -> None:
+def content_hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode('utf-8')).hexdigest()
+
+def build_section(number: str, title: str, chapter: str, content_lines: List[str],
+                  splitter: "RecursiveCharacterTextSplitter") -> ParsedSection | None:
     content = "\n".join(content_lines).strip()
-    if not content:
-        return
-    
-    section_id= await insert_dpdp_act( pool=pool, section_number=section["number"],
-                                    section_title=section["title"], chapter=chapter, content=content,
-                                    is_chunk=False, chunk_index=None )
-    
-    logger.debug(f"Stored section {section['number']} with ID: {section_id}")
-    
-    chunks= splitter.split_text(content)
-    for idx, chunk in enumerate (chunks, 1):
-        if not chunk.strip():
-            continue
-        chunk_id= await insert_dpdp_act( pool=pool, section_number=section["number"], 
-                                        section_title=section["title"],chapter=chapter, content=chunk, 
-                                        is_chunk=True, chunk_index=idx )
-        batch_vectors.append({
-            "text" : chunk,
-            "metadata" : {
-                "id" : chunk_id,
-                "section_number": section['number'],
-                "chapter": chapter,
-                "chunk_index": idx,
-                "content": chunk[:500],
-                "type": "dpdp_act"
-            }
-        })
-        
-        logger.debug(f"Stored chunk {idx} for section {section['number']} with ID: {chunk_id}") 
+    if not number or not content:
+        return None
+    chunks = [
+        ParsedChunk(chunk_index=idx, content=chunk, content_hash=content_hash(title, chapter, chunk))
+        for idx, chunk in enumerate(splitter.split_text(content), 1) if chunk.strip()
+    ]
+    return ParsedSection(
+        number=number, title=title, chapter=chapter, content=content,
+        content_hash=content_hash(title, chapter, content), chunks=chunks
+    )
 
-            
-async def parse_dpdp_act(file_path: str, pool: Pool) -> None:
-    
+async def parse_dpdp_sections(file_path: str) -> List[ParsedSection]:
     if not Path(file_path).exists():
         logger.error(f'DPDP Act file not found {file_path}')
         raise FileNotFoundError(f'file not found : {file_path}')
-    
+
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
     logger.info(f"Parsing DPDP Act: {file_path}")
     chapter_regex= re.compile(r'CHAPTER\s+[IVXLC]+(?:\s+[A-Z\s]+)?', re.IGNORECASE)
     section_regex = re.compile(
         r'^(Section|Schedule)\s+(\d+\.\d*|[a-z]+\)|[A-Z]+|[IVXLC]+|[0-9]+(?:\([a-zA-Z0-9]+\))*)(?:\.)?\s*(.*)?$',
         re.IGNORECASE
     )
-    
-    current_chapter = "Unknown"
-    current_section: SectionData | None = None
-    section_content: List[str] = []
-    batch_vectors: List[Dict] = []
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=settings.chunk_size ,
         chunk_overlap=settings.chunk_overlap
     )
-    
+
+    sections: List[ParsedSection] = []
+    current_chapter = "Unknown"
+    current: Dict | None = None         # number, title and chapter of the section being read
+    section_content: List[str] = []
+
+    def close_section() -> None:
+        if current:
+            section = build_section(current["number"], current["title"], current["chapter"], section_content, text_splitter)
+            if section:
+                sections.append(section)
+
     async for line in read_file(file_path):
         if not line:
             continue
         if chapter_regex.match(line):
             current_chapter = line.title()
             continue
-        
+
         section_match = section_regex.match(line)
         if section_match:
-            if current_section and validate_section(current_section):
-                await store_section(
-                    pool, current_chapter,current_section, section_content, text_splitter, batch_vectors
-                )
-                
-            current_section = SectionData(
-                number=f"{section_match.group(1)} {section_match.group(2)}".title(),
-                title=section_match.group(3).strip().title() if section_match.group(3) else "",
-                content=[]
-            )
+            close_section()
+            current = {
+                "number": f"{section_match.group(1)} {section_match.group(2)}".title(),
+                "title": section_match.group(3).strip().title() if section_match.group(3) else "",
+                "chapter": current_chapter
+            }
             section_content = []
             continue
-        
-        if current_section:
+
+        if current:
             section_content.append(line)
-            
-    if current_section and validate_section(current_section):
-        await store_section(
-            pool, current_chapter, current_section, section_content, text_splitter, batch_vectors
+    close_section()
+    return sections
+
+def plan_dpdp_ingest(sections: List[ParsedSection], existing_rows: List[Dict], full: bool = False) -> IngestPlan:
+    """Diff parsed sections against stored rows keyed on (section_number, chunk_index, content_hash)."""
+    existing: Dict[str, Dict] = {}
+    for row in existing_rows:
+        stored = existing.setdefault(row["section_number"], {"content_hash": None, "chunks": {}})
+        row_hash = None if full else row["content_hash"]       # full re-ingest treats every stored row as stale
+        if row["is_chunk"]:
+            stored["chunks"][row["chunk_index"]] = (row["id"], row_hash)
+        else:
+            stored["content_hash"] = row_hash
+
+    plan = IngestPlan(changes=[], removed_sections=[], removed_section_chunk_ids=[], unchanged=0)
+    for section in sections:
+        stored = existing.get(section["number"])
+        if stored and stored["content_hash"] == section["content_hash"]:
+            plan["unchanged"] += 1
+            continue
+        stored_chunks = stored["chunks"] if stored else {}
+        new_indexes = {chunk["chunk_index"] for chunk in section["chunks"]}
+        removed = sorted(index for index in stored_chunks if index not in new_indexes)
+        plan["changes"].append(SectionChange(
+            section=section,
+            status="changed" if stored else "added",
+            changed_chunks=[
+                chunk for chunk in section["chunks"]
+                if stored_chunks.get(chunk["chunk_index"], (None, None))[1] != chunk["content_hash"]
+            ],
+            removed_chunk_indexes=removed,
+            removed_chunk_ids=[stored_chunks[index][0] for index in removed]
+        ))
+
+    parsed_numbers = {section["number"] for section in sections}
+    for number, stored in existing.items():
+        if number not in parsed_numbers:
+            plan["removed_sections"].append(number)
+            plan["removed_section_chunk_ids"].extend(chunk_id for chunk_id, _ in stored["chunks"].values())
+    return plan
+
+def format_plan(plan: IngestPlan) -> str:       # human readable dry-run diff
+    lines = []
+    for change in plan["changes"]:
+        section = change["section"]
+        if change["status"] == "added":
+            lines.append(f"+ {section['number']} ({len(section['chunks'])} chunks)")
+        else:
+            lines.append(
+                f"~ {section['number']} ({len(change['changed_chunks'])} of {len(section['chunks'])} chunks changed, "
+                f"{len(change['removed_chunk_indexes'])} removed)"
+            )
+    lines.extend(f"- {number}" for number in plan["removed_sections"])
+    lines.append(
+        f"{len(plan['changes'])} sections to write, {len(plan['removed_sections'])} to delete, {plan['unchanged']} unchanged"
+    )
+    return "\n".join(lines)
+
+async def apply_dpdp_ingest(plan: IngestPlan, pool: Pool, embedding_service: EmbeddingService) -> None:
+    # vectors are deleted before their rows and hashes are written after the vectors, so a failure at any
+    # step leaves the rows looking stale and the next run repeats the missing work
+    stale_vector_ids: List[int] = list(plan["removed_section_chunk_ids"])
+    for change in plan["changes"]:
+        stale_vector_ids.extend(change["removed_chunk_ids"])
+    if stale_vector_ids:
+        await embedding_service.delete_embeddings([str(chunk_id) for chunk_id in stale_vector_ids], namespace="dpdp_act")
+        logger.info(f"Deleted {len(stale_vector_ids)} stale DPDP Act embeddings")
+
+    batch_vectors: List[Dict] = []
+    for change in plan["changes"]:
+        section = change["section"]
+        chunk_ids = await upsert_dpdp_section(
+            pool, section["number"], section["title"], section["chapter"], section["content"],
+            change["changed_chunks"], change["removed_chunk_indexes"]
         )
-        
+        for chunk in change["changed_chunks"]:
+            batch_vectors.append({
+                "text" : chunk["content"],
+                "metadata" : {
+                    "id" : chunk_ids[chunk["chunk_index"]],
+                    "section_number": section['number'],
+                    "chapter": section["chapter"],
+                    "chunk_index": chunk["chunk_index"],
+                    "content": chunk["content"][:500],
+                    "type": "dpdp_act"
+                }
+            })
+        logger.debug(f"Stored section {section['number']} with {len(change['changed_chunks'])} changed chunks")
+
+    if plan["removed_sections"]:
+        await delete_dpdp_sections(pool, plan["removed_sections"])
     if batch_vectors:
-        await asyncio.gather(
-            *[
-                embedding_service.store_embeddings(
-                    texts=[item["text"]],
-                    metadata=[item["metadata"]],
-                    namespace="dpdp_act"
-                )
-                for item in batch_vectors
-            ]
+        await embedding_service.store_embeddings(
+            texts=[item["text"] for item in batch_vectors],
+            metadata=[item["metadata"] for item in batch_vectors],
+            namespace="dpdp_act"
         )
         logger.info(f"Stored {len(batch_vectors)} embeddings for DPDP Act")
-    
+    if plan["changes"]:
+        await mark_dpdp_sections_embedded(pool, [
+            {
+                "section_number": change["section"]["number"],
+                "content_hash": change["section"]["content_hash"],
+                "chunks": [
+                    {"chunk_index": chunk["chunk_index"], "content_hash": chunk["content_hash"]}
+                    for chunk in change["changed_chunks"]
+                ]
+            }
+            for change in plan["changes"]
+        ])
+    if plan["changes"] or plan["removed_sections"]:
+        await notify_dpdp_act_changed(pool)
+
+async def parse_dpdp_act(file_path: str, pool: Pool, embedding_service: EmbeddingService | None,
+                         dry_run: bool = False, full: bool = False) -> IngestPlan:
+    sections = await parse_dpdp_sections(file_path)
+    plan = plan_dpdp_ingest(sections, await fetch_dpdp_act_index(pool), full=full)
+    logger.info(f"DPDP Act ingest plan:\n{format_plan(plan)}")
+    if dry_run:
+        return plan
+    await apply_dpdp_ingest(plan, pool, embedding_service)
     logger.info('Completed DPDP Act parsing and storage')
-    
-        
-async def parse_user_doc(file_path: str, pool: Pool) -> List[int]:
+    return plan
+
+class IncrementalSplitter:
+    """Feeds text into a RecursiveCharacterTextSplitter and emits chunks once they can no longer change."""
+
+    def __init__(self, splitter: "RecursiveCharacterTextSplitter", flush_size: int):
+        self.splitter = splitter
+        self.flush_size = flush_size
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        if len(self.buffer) < self.flush_size:
+            return []
+        chunks = self.splitter.split_text(self.buffer)
+        if len(chunks) < 2:
+            return []
+        # last chunk may still grow with the next page, it carries the overlap; keep it unsplit from the
+        # buffer, the splitter strips the trailing whitespace that separates it from the next page
+        tail = self.buffer.rfind(chunks[-1])
+        self.buffer = self.buffer[tail:] if tail >= 0 else chunks[-1] + "\n"
+        return chunks[:-1]
+
+    def flush(self) -> List[str]:
+        chunks = self.splitter.split_text(self.buffer) if self.buffer.strip() else []
+        self.buffer = ""
+        return chunks
+
+async def parse_user_doc(file_path: str, pool: Pool, embedding_service: EmbeddingService,
+                         content_hash: str | None = None) -> int:
     file = Path(file_path)
     if not file.exists():
         raise FileNotFoundError(f"Document not found: {file_path}")
-
-    logger.info(f"Parsing document: {file.name}")
-    text = ""
-    if file.suffix == '.pdf':
-        with fitz.open(file) as doc:
-            for page in doc:
-                text += page.get_text()
-    elif file.suffix == '.docx':
-        doc = Document(file)
-        text = "\n".join(para.text for para in doc.paragraphs)
-    else:
+    if file.suffix not in ('.pdf', '.docx'):
         raise ValueError("Only PDF or DOCX supported")
 
-    if not text.strip():
-        raise ValueError(f"Document is empty: {file.name}")
-
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    logger.info(f"Parsing document: {file.name}")
+    chunk_size = settings.chunk_size or 1000
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.chunk_size or 1000,
+        chunk_size=chunk_size,
         chunk_overlap=settings.chunk_overlap or 200
     )
-    chunks = text_splitter.split_text(text)
-    document_ids = []
-    batch_vectors = []
-
-    for idx, chunk in enumerate(chunks, 1):
-        if not chunk.strip():
-            continue
-        document_id = await insert_document(pool, file.name, chunk)
-        document_ids.append(document_id)
-        batch_vectors.append({
-            "text": chunk,
-            "metadata": {
-                "id": document_id,
-                "filename": file.name,
-                "chunk_index": idx,
-                "type": "document"
-            }
-        })
+    splitter = IncrementalSplitter(text_splitter, flush_size=settings.ingest_batch_size * chunk_size)
+    document_id: int | None = None
+    chunk_ids: List[int] = []
+    pending: List[str] = []
+    embed_task: asyncio.Task | None = None
 
-    if batch_vectors:
-        await embedding_service.store_embeddings(
-            texts=[item["text"] for item in batch_vectors],
-            metadata=[item["metadata"] for item in batch_vectors],
+    async def store_batch(chunks: List[str]) -> None:    # insert now, embed while the next batch is extracted
+        nonlocal embed_task, document_id
+        if document_id is None:     # hash is set once every chunk is embedded, dedupe never sees a partial row
+            document_id = await insert_document(pool, file.name)
+        first_index = len(chunk_ids) + 1
+        with timed("db_insert_chunks"):
+            ids = await insert_document_chunks(pool, document_id, first_index, chunks)
+        chunk_ids.extend(ids)
+        if embed_task:
+            await embed_task
+        embed_task = asyncio.create_task(embedding_service.store_embeddings(
+            texts=chunks,
+            metadata=[
+                {"id": chunk_id, "document_id": document_id, "filename": file.name, "chunk_index": idx, "type": "document"}
+                for idx, chunk_id in enumerate(ids, first_index)
+            ],
             namespace="documents"
-        )
+        ))
+
+    try:
+        async for text in iter_document_text(file):
+            with timed("split"):
+                pending.extend(chunk for chunk in splitter.feed(text) if chunk.strip())
+            if len(pending) >= settings.ingest_batch_size:
+                await store_batch(pending)
+                pending = []
+        pending.extend(chunk for chunk in splitter.flush() if chunk.strip())
+        if pending:
+            await store_batch(pending)
+        if embed_task:
+            await embed_task
+        if document_id is not None and content_hash:
+            await set_document_hash(pool, document_id, content_hash)
+    except BaseException:
+        if embed_task and not embed_task.done():
+            embed_task.cancel()
+        if document_id is not None:     # no half-ingested document for dedupe to return later
+            await delete_document(pool, document_id)
+            await embedding_service.delete_embeddings([str(chunk_id) for chunk_id in chunk_ids], namespace="documents")
+        raise
 
-    logger.info(f"Stored {len(document_ids)} chunks for {file.name}")
-    return document_ids
\ No newline at end of file
+    if document_id is None:
+        raise ValueError(f"Document is empty: {file.name}")
+    UPLOAD_CHUNKS.observe(len(chunk_ids))
+    logger.info(f"Stored {len(chunk_ids)} chunks for {file.name} as document_id: {document_id}")
+    return document_id
\ No newline at end of file
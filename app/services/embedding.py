@@ -1,35 +1,99 @@
-from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone, Index
 from app.core.config import settings
+from app.services.embedding_engine import BatchingEncoder, RemoteEncoder, load_encode_fn, embedding_model_id
+from app.services.vector_store import VectorStore, create_vector_store
+from app.services.embedding_cache import EmbeddingCache
+from app.core.metrics import timed
 from loguru import logger
-from typing import List, Dict
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
+from typing import List, Dict, Any
+import numpy as np
+import asyncio
 
 class EmbeddingService:
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.pc = Pinecone(api_key=settings.pinecone_api_key)
-        self.index_name = "compliguard-index"
-        self.index: Index | None = None
+        if settings.use_embedding_server:        # model lives in the shared sidecar process
+            self.encoder = RemoteEncoder(settings.embedding_socket_path)
+        else:
+            self.encoder = BatchingEncoder(
+                load_encode_fn(settings.embedding_backend, settings.embedding_max_batch_size),
+                max_batch_size=settings.embedding_max_batch_size,
+                max_wait_ms=settings.embedding_max_wait_ms
+            )
+        self.cache = EmbeddingCache(
+            embedding_model_id(), settings.embedding_cache_memory_mb * 1024 * 1024
+        ) if settings.embedding_cache_enabled else None
+        self.vector_stores: Dict[str, VectorStore] = {}
         logger.info("EmbeddingService initialized")
-        
-    def _get_index(self) -> Index:
-        if not self.index:
-            self.index= self.pc.Index(self.index_name)
-            return self.index
-        
+
+    def _store_for(self, namespace: str) -> VectorStore:     # backend per namespace from settings
+        backend = settings.vector_store_backends.get(namespace, "pinecone")
+        if backend not in self.vector_stores:
+            self.vector_stores[backend] = create_vector_store(backend)
+        return self.vector_stores[backend]
+
+    def ensure_vector_stores(self) -> None:
+        for namespace in settings.vector_store_backends:
+            self._store_for(namespace).ensure_ready()
+
+    async def warm_up(self) -> None:    # first encode call allocates buffers, keep it off the request path
+        await self.generate_embeddings(["warm up"])
+        logger.info("EmbeddingService warmed up")
+
     async def generate_embeddings(self, texts: List[str] ) -> List[List[float]]:
-        embeddings= self.model.encode(texts, convert_to_tensor=False).tolist()
-        logger.debug(f"Generated embeddings for {len(texts)} texts")
-        return embeddings
-    
+        if not self.cache:
+            with timed("embed_encode"):
+                embeddings= (await self.encoder.encode(texts)).tolist()     # batched off the event loop
+            logger.debug(f"Generated embeddings for {len(texts)} texts")
+            return embeddings
+
+        keys= [self.cache.key(text) for text in texts]
+        unique_keys= list(dict.fromkeys(keys))
+        vectors= await self.cache.get_many(unique_keys)
+        missing= {key: text for key, text in zip(keys, texts) if key not in vectors}     # only misses reach the model
+        if missing:
+            with timed("embed_encode"):
+                encoded= await self.encoder.encode(list(missing.values()))
+            new_vectors= {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, encoded)}
+            await self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+        logger.debug(f"Generated embeddings for {len(texts)} texts, {len(missing)} encoded")
+        return [vectors[key].tolist() for key in keys]
+
+    async def close(self) -> None:
+        await self.encoder.close()
+
+    async def _store_batch(self, texts: List[str], metadata: List[Dict], namespace: str,
+                           semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            embeddings= await self.generate_embeddings(texts)
+            vectors=[
+                {'id': str(meta['id']), 'values': embedding, 'metadata':meta} for embedding, meta in zip(embeddings, metadata)
+            ]
+            async for attempt in AsyncRetrying(stop=stop_after_attempt(settings.vector_upsert_retries),
+                                               wait=wait_exponential(min=1, max=10), reraise=True):
+                with attempt, timed("vector_upsert"):       # retry only this batch, finished batches are kept
+                    await self._store_for(namespace).upsert(vectors, namespace)
+
     async def store_embeddings(self, texts: List[str], metadata:List[Dict], namespace: str) -> None:
-        embeddings= await self.generate_embeddings(texts)
-        
-        vectors=[
-            {'id': str(meta['id']), 'values': embedding, 'metadata':meta} for embedding, meta in zip(embeddings, metadata)
-        ]
-        
-        self._get_index().upsert(vectors=vectors, namespace=namespace)  
-        logger.info(f"Stored {len(vectors)} embeddings in {namespace}")
-        
-embedding_service= EmbeddingService()
\ No newline at end of file
+        batch_size= settings.vector_upsert_batch_size
+        semaphore= asyncio.Semaphore(settings.vector_upsert_concurrency)
+        batches= [(start, start + batch_size) for start in range(0, len(texts), batch_size)]
+        results= await asyncio.gather(
+            *[self._store_batch(texts[start:end], metadata[start:end], namespace, semaphore) for start, end in batches],
+            return_exceptions=True
+        )
+
+        failed= [(start, end, result) for (start, end), result in zip(batches, results) if isinstance(result, Exception)]
+        for start, end, error in failed:
+            logger.error(f"Failed to store embeddings {start}-{end} in {namespace}: {error}")
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(batches)} embedding batches failed for {namespace}")
+        logger.info(f"Stored {len(texts)} embeddings in {namespace} in {len(batches)} batches")
+
+    async def query_embeddings(self, vector: List[float], namespace: str, top_k: int = 10,
+                               filter: Dict[str, Any] | None = None) -> List[Dict]:
+        with timed("vector_query"):
+            return await self._store_for(namespace).query(vector, namespace, top_k=top_k, filter=filter)
+
+    async def delete_embeddings(self, ids: List[str], namespace: str) -> None:
+        await self._store_for(namespace).delete(ids, namespace)
\ No newline at end of file
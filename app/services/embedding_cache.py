@@ -0,0 +1,78 @@
+from asyncpg import Pool
+from app.core.cache import LRUCache
+from app.core.metrics import CACHE_LOOKUPS
+from app.repository.embedding import fetch_cached_embeddings, insert_cached_embeddings
+from loguru import logger
+from typing import List, Dict
+import numpy as np
+import unicodedata
+import hashlib
+import re
+
+def normalize_text(text: str) -> str:       # whitespace and unicode form do not change the embedding
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip()
+
+def embedding_cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """Content-addressed embeddings: in-memory LRU in front of a Postgres table of float32 blobs."""
+
+    def __init__(self, model: str, max_memory_bytes: int):
+        self.model = model
+        self.memory = LRUCache(max_size=max_memory_bytes, sizeof=lambda vector: vector.nbytes)
+        self.pool: Pool | None = None
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def attach_pool(self, pool: Pool) -> None:      # enables the persistent tier
+        self.pool = pool
+
+    def key(self, text: str) -> str:
+        return embedding_cache_key(self.model, text)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+        self.memory_hits += len(found)
+        CACHE_LOOKUPS.labels("embedding", "memory_hit").inc(len(found))
+
+        remaining = [key for key in keys if key not in found]
+        if remaining and self.pool:
+            try:
+                rows = await fetch_cached_embeddings(self.pool, remaining)
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed, encoding instead: {e}")
+                rows = {}
+            for key, (dim, blob) in rows.items():
+                vector = np.frombuffer(blob, dtype='<f4').reshape(dim)
+                self.memory.set(key, vector)
+                found[key] = vector
+            self.db_hits += len(rows)
+            CACHE_LOOKUPS.labels("embedding", "db_hit").inc(len(rows))
+        self.misses += len(keys) - len(found)
+        CACHE_LOOKUPS.labels("embedding", "miss").inc(len(keys) - len(found))
+        return found
+
+    async def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        for key, vector in vectors.items():
+            self.memory.set(key, vector)
+        if not self.pool or not vectors:
+            return
+        rows = [(key, vector.shape[0], np.ascontiguousarray(vector, dtype='<f4').tobytes()) for key, vector in vectors.items()]
+        try:
+            await insert_cached_embeddings(self.pool, self.model, rows)
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(rows)} embeddings: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            **{f"memory_{name}": value for name, value in self.memory.stats().items()}
+        }
\ No newline at end of file
@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from loguru import logger
+from typing import Callable, List, Tuple
+import numpy as np
+import asyncio
+import struct
+import json
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+class BatchingEncoder:
+    """Runs encode calls on a dedicated thread and merges concurrent requests into one batch."""
+
+    def __init__(self, encode_fn: EncodeFn, max_batch_size: int, max_wait_ms: float):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embedding-encoder')
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    def _ensure_worker(self) -> asyncio.Queue:      # started lazily so it binds to the running loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        return self._queue
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        await self._ensure_worker().put((texts, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[List[str], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            batch = [(texts, future) for texts, future in batch if not future.done()]   # skip cancelled callers
+            if not batch:
+                continue
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                vectors = await loop.run_in_executor(self._executor, self.encode_fn, texts)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.debug(f"Encoded batch of {len(texts)} texts for {len(batch)} requests")
+            offset = 0
+            for request_texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    async def close(self) -> None:
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+# Wire format shared with app/services/embedding_server.py: every frame is a 4 byte big-endian
+# length followed by the payload. Request is a JSON frame {"texts": [...]}, response is a JSON
+# header frame {"ok": true, "rows": n, "dim": d} followed by a frame of float32 little-endian values.
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    header = await reader.readexactly(4)
+    (length,) = struct.unpack('>I', header)
+    return await reader.readexactly(length)
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(struct.pack('>I', len(payload)) + payload)
+
+class RemoteEncoder:
+    """Client for the shared embedding server listening on a Unix socket."""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            write_frame(writer, json.dumps({"texts": texts}).encode('utf-8'))
+            await writer.drain()
+            header = json.loads(await read_frame(reader))
+            if not header.get("ok"):
+                raise RuntimeError(f"Embedding server error: {header.get('error')}")
+            body = await read_frame(reader)
+            return np.frombuffer(body, dtype='<f4').reshape(header["rows"], header["dim"])
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def close(self) -> None:
+        pass
+
+def make_encode_fn(model, batch_size: int) -> EncodeFn:     # wrap a SentenceTransformer for BatchingEncoder
+    def encode(texts: List[str]) -> np.ndarray:
+        return np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+    return encode
+
+def load_encode_fn(backend: str, batch_size: int) -> EncodeFn:      # "torch" or "onnx", same vectors either way
+    if backend == "onnx":
+        from app.services.onnx_embedder import load_onnx_embedder
+        embedder = load_onnx_embedder()
+        return lambda texts: embedder.encode(texts, batch_size)
+    if backend != "torch":
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    from sentence_transformers import SentenceTransformer
+    return make_encode_fn(SentenceTransformer(settings.embedding_model), batch_size)
+
+def embedding_model_id() -> str:     # cache namespace, int8 vectors differ slightly from the reference
+    if settings.embedding_backend == "onnx":
+        return f"{settings.embedding_model}:onnx{'-int8' if settings.onnx_quantize else ''}"
+    return settings.embedding_model
\ No newline at end of file
@@ -0,0 +1,61 @@
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.services.embedding_engine import BatchingEncoder, load_encode_fn, read_frame, write_frame
+from loguru import logger
+from pathlib import Path
+import numpy as np
+import argparse
+import asyncio
+import json
+
+# Shared embedding sidecar: one model in memory for every API worker on the host.
+# Run with `python -m app.services.embedding_server` and set USE_EMBEDDING_SERVER=true for the API.
+
+async def handle_client(encoder: BatchingEncoder, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                request = json.loads(await read_frame(reader))
+            except asyncio.IncompleteReadError:
+                break       # client closed the connection
+            try:
+                vectors = await encoder.encode(request["texts"])
+            except Exception as e:
+                write_frame(writer, json.dumps({"ok": False, "error": str(e)}).encode('utf-8'))
+                await writer.drain()
+                continue
+            vectors = np.ascontiguousarray(vectors, dtype='<f4')
+            write_frame(writer, json.dumps({"ok": True, "rows": vectors.shape[0], "dim": vectors.shape[1]}).encode('utf-8'))
+            write_frame(writer, vectors.tobytes())
+            await writer.drain()
+    except Exception as e:
+        logger.error(f"Embedding server connection error: {e}")
+    finally:
+        writer.close()
+
+async def serve(socket_path: str) -> None:
+    encoder = BatchingEncoder(
+        load_encode_fn(settings.embedding_backend, settings.embedding_max_batch_size),
+        max_batch_size=settings.embedding_max_batch_size,
+        max_wait_ms=settings.embedding_max_wait_ms
+    )
+    await encoder.encode(["warm up"])
+
+    Path(socket_path).unlink(missing_ok=True)      # stale socket from a previous run
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_client(encoder, reader, writer), path=socket_path
+    )
+    logger.info(f"Embedding server listening on {socket_path}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await encoder.close()
+        Path(socket_path).unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared embedding server for Regulens API workers")
+    parser.add_argument("--socket", default=settings.embedding_socket_path, help="Unix socket path")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(serve(args.socket))
\ No newline at end of file
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor, Future
+from app.core.config import settings
+from app.core.metrics import timed
+from loguru import logger
+from pathlib import Path
+from typing import AsyncIterator, List
+import multiprocessing
+import asyncio
+
+_executor: ProcessPoolExecutor | None = None
+
+def get_executor() -> ProcessPoolExecutor:     # spawn, forking a process that holds torch threads is unsafe
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.extraction_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+# fitz and python-docx are imported inside the worker functions, the API process never needs them
+
+def pdf_page_count(path: str) -> int:
+    import fitz
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:     # runs in a worker process
+    import fitz
+    with fitz.open(path) as doc:
+        return [doc[number].get_text() for number in range(start, end)]
+
+def extract_docx_paragraphs(path: str) -> List[str]:     # runs in a worker process
+    from docx import Document
+    return [para.text + "\n" for para in Document(path).paragraphs]
+
+class _WaitBudget:
+    """Seconds left for waiting on worker futures; time the consumer spends between pages is not counted."""
+
+    def __init__(self, seconds: float):
+        self.remaining = seconds
+
+async def _result(future: Future, budget: _WaitBudget, file: Path):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        with timed("extract"):      # time spent waiting on the worker processes
+            return await asyncio.wait_for(asyncio.wrap_future(future), max(budget.remaining, 0))
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Extraction of {file.name} exceeded {settings.extraction_timeout_seconds}s")
+    finally:
+        budget.remaining -= loop.time() - started
+
+async def iter_document_text(file: Path) -> AsyncIterator[str]:
+    """Yield page (PDF) or paragraph (DOCX) text in order, extracted in the process pool."""
+    executor = get_executor()
+    budget = _WaitBudget(settings.extraction_timeout_seconds)
+    if file.suffix == '.docx':
+        for paragraph in await _result(executor.submit(extract_docx_paragraphs, str(file)), budget, file):
+            yield paragraph
+        return
+    if file.suffix != '.pdf':
+        raise ValueError("Only PDF or DOCX supported")
+
+    page_count = await _result(executor.submit(pdf_page_count, str(file)), budget, file)
+    step = settings.extraction_pages_per_task
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    window = settings.extraction_workers * 2        # bounds pages held in memory
+    pending: List[Future] = []
+    submitted = 0
+    logger.debug(f"Extracting {page_count} pages of {file.name} in {len(ranges)} ranges")
+    try:
+        while submitted < len(ranges) or pending:
+            while submitted < len(ranges) and len(pending) < window:
+                pending.append(executor.submit(extract_pdf_pages, str(file), *ranges[submitted]))
+                submitted += 1
+            for page_text in await _result(pending.pop(0), budget, file):     # reassemble in page order
+                yield page_text
+    finally:
+        for future in pending:
+            future.cancel()
\ No newline at end of file
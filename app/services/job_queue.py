@@ -0,0 +1,84 @@
+from asyncpg import Pool
+from app.repository.job import insert_job, update_job, claim_job, renew_job_lease
+from loguru import logger
+from typing import Awaitable, Callable, Dict, List
+import asyncio
+
+JobHandler = Callable[[Dict], Awaitable[Dict]]
+
+class JobQueue:
+    """Bounded pool of workers claiming jobs from the jobs table, shared safely between processes."""
+
+    def __init__(self, pool: Pool, handlers: Dict[str, JobHandler], workers: int, node: str,
+                 lease_seconds: float = 60.0, poll_seconds: float = 2.0):
+        self.pool = pool
+        self.handlers = handlers
+        self.workers = workers
+        self.node = node        # host name, jobs that need local files are claimed only here
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.submitted = asyncio.Event()        # wakes idle workers in this process early
+        self.tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        # queued jobs and jobs whose lease expired (their worker died) are claimed from the table
+        self.tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def submit(self, kind: str, payload: Dict, local: bool = False) -> int:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = await insert_job(self.pool, kind, payload, node=self.node if local else None)
+        self.submitted.set()
+        return job_id
+
+    async def _next_job(self) -> Dict:
+        while True:
+            self.submitted.clear()
+            try:
+                job = await claim_job(self.pool, self.node, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Could not claim a job: {e}")
+                job = None
+            if job:
+                return job
+            try:
+                await asyncio.wait_for(self.submitted.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _heartbeat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await renew_job_lease(self.pool, job_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Could not renew lease of job {job_id}: {e}")
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._next_job()
+            job_id, kind = job["id"], job["kind"]
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                handler = self.handlers.get(kind)
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {kind}")
+                result = await handler(job["payload"])
+                await update_job(self.pool, job_id, "completed", result=result)
+                logger.info(f"Worker {worker_id} completed {kind} job {job_id}")
+            except asyncio.CancelledError:
+                raise       # shutdown, the lease lapses and the job is claimed again
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed {kind} job {job_id}: {e}")
+                try:
+                    await update_job(self.pool, job_id, "failed", error=str(e))
+                except Exception as db_error:
+                    logger.error(f"Could not record failure of job {job_id}: {db_error}")
+            finally:
+                heartbeat.cancel()
+
+    async def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
\ No newline at end of file
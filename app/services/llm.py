@@ -1,17 +1,28 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
 from loguru import logger
 from app.core.config import settings
-from tenacity import retry, stop_after_attempt, wait_exponential
+from app.services.audit_cache import AuditCache
+from app.services.prompt_packer import PromptPacker
+from app.services.llm_limiter import LLMLimiter, INTERACTIVE, is_retryable
+from app.core.metrics import timed, PROMPT_TOKENS, LLM_CALLS
 import re
-from typing import Dict
+from typing import List, Dict, Callable
+
+PROMPT_VERSION = "2"     # bump whenever prompt_template changes, invalidates cached audits
 
 class LLMService:
     def __init__(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI     # heavy, loaded at warm-up not at import
+        from langchain.prompts import PromptTemplate
+
         self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
+            model=settings.llm_model,
             google_api_key=settings.google_api_key,
-            temperature=0.2
+            temperature=0.2,
+            max_retries=1       # retries go through the limiter so they respect the shared backoff
+        )
+        self.limiter = LLMLimiter(
+            settings.llm_requests_per_minute, settings.llm_tokens_per_minute, settings.llm_max_in_flight,
+            settings.llm_backoff_base_seconds, settings.llm_backoff_max_seconds
         )
         self.prompt_template = PromptTemplate(
             input_variables=["document_text", "regulation_text"],
@@ -30,27 +41,79 @@ class LLMService:
                 {regulation_text}
                 """
         )
+        self.packer = PromptPacker(settings.llm_model, settings.prompt_token_budget, settings.prompt_document_share)
+        self.cache = AuditCache(
+            PROMPT_VERSION, settings.llm_model, settings.audit_cache_ttl_seconds, settings.audit_cache_memory_entries
+        ) if settings.audit_cache_enabled else None
         logger.info("LLMService initialized")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=4, max=30))
-    async def analyze_compliance(self, document_text: str, regulation_text: str) -> Dict[str, any]:
-        max_chars = 15000
-        if len(document_text) > max_chars:
-            document_text = document_text[:max_chars] + "..."
-            logger.warning("Document text truncated")
-        if len(regulation_text) > max_chars:
-            sections = regulation_text.split("\n")
-            prioritized = [s for s in sections if any(f"Section {i}" in s for i in range(4, 10))]
-            regulation_text = "\n".join(prioritized)[:max_chars] + "..."
-            logger.warning("Regulation text truncated")
+    async def analyze_compliance(self, document_text: str, matched_sections: List[Dict],
+                                 on_token: Callable[[str], None] | None = None,
+                                 priority: int = INTERACTIVE) -> Dict[str, any]:
+        document_text, regulation_text = self.packer.pack(document_text, matched_sections)
+        if not self.cache:
+            return await self._analyze(document_text, regulation_text, on_token, priority)
+        key = self.cache.key(document_text, regulation_text)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            logger.info("Returning cached audit result")
+            return cached
+        result = await self._analyze(document_text, regulation_text, on_token, priority)
+        await self.cache.set(key, result)
+        return result
 
+    async def _analyze(self, document_text: str, regulation_text: str,
+                       on_token: Callable[[str], None] | None = None, priority: int = INTERACTIVE) -> Dict[str, any]:
         prompt = self.prompt_template.format(
             document_text=document_text,
             regulation_text=regulation_text
         )
-        response = await self.llm.ainvoke(prompt)
-        raw_response = response.content.strip()
+        raw_response = await self._complete_with_retry(prompt, on_token, priority)
         logger.debug(f"LLM response: {raw_response}")
+        with timed("llm_parse"):
+            return self.parse_response(raw_response)    # parsing is never retried
+
+    async def _complete_with_retry(self, prompt: str, on_token: Callable[[str], None] | None,
+                                   priority: int) -> str:
+        prompt_tokens = self.packer.count_tokens(prompt)
+        PROMPT_TOKENS.observe(prompt_tokens)
+        tokens = prompt_tokens + settings.llm_output_tokens
+        streamed = []       # once tokens reached the client a retry would repeat them
+
+        def sink(text: str) -> None:
+            streamed.append(text)
+            on_token(text)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            async with self.limiter.slot(priority, tokens):
+                try:
+                    with timed("llm_call"):
+                        response = await self._complete(prompt, sink if on_token else None)
+                    self.limiter.record_success()
+                    LLM_CALLS.labels("success").inc()
+                    return response
+                except Exception as e:
+                    if not is_retryable(e) or streamed or attempt == settings.llm_max_retries:
+                        LLM_CALLS.labels("error").inc()
+                        raise
+                    LLM_CALLS.labels("retry").inc()
+                    pause = self.limiter.record_throttle()
+                    logger.warning(f"Gemini call failed (attempt {attempt}), retrying after {pause:.1f}s: {e}")
+
+    async def _complete(self, prompt: str, on_token: Callable[[str], None] | None = None) -> str:
+        if not on_token:
+            response = await self.llm.ainvoke(prompt)
+            return response.content.strip()
+        parts = []
+        async for chunk in self.llm.astream(prompt):    # tokens reach the caller as Gemini produces them
+            if chunk.content:
+                parts.append(chunk.content)
+                on_token(chunk.content)
+        return "".join(parts).strip()
+
+    def parse_response(self, raw_response: str) -> Dict[str, any]:
 
         status_match = re.search(r"- Compliance Status: (True|False)", raw_response, re.IGNORECASE)
         gaps_match = re.search(r"- Gaps:([\s\S]*?)(?=- Suggestions:|$)", raw_response, re.IGNORECASE)
@@ -80,6 +143,4 @@ class LLMService:
             "compliance_status": status,
             "gaps": gaps,
             "suggestions": suggestions
-        }
-        
-llm_service= LLMService()
\ No newline at end of file
+        }
\ No newline at end of file
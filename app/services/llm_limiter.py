@@ -0,0 +1,148 @@
+from contextlib import asynccontextmanager
+from app.core.metrics import record
+from loguru import logger
+from typing import Dict, List, AsyncIterator
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+INTERACTIVE = 0     # request priorities, lower runs first
+BATCH = 1
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "BadGateway", "GatewayTimeout", "DeadlineExceeded"}
+
+def is_retryable(error: Exception) -> bool:       # provider throttling or server errors
+    for e in (error, error.__cause__):
+        if e is None:
+            continue
+        if type(e).__name__ in RETRYABLE_ERRORS:
+            return True
+        if getattr(e, "code", None) in RETRYABLE_STATUS or getattr(e, "status_code", None) in RETRYABLE_STATUS:
+            return True
+    return False
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0       # refill per second
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+class LLMLimiter:
+    """Process-wide gate for Gemini calls: RPM/TPM token buckets, an in-flight cap and a priority queue.
+
+    Throttling responses halve the request rate and pause dispatch for a jittered backoff, successes
+    restore the rate step by step.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_in_flight: int,
+                 backoff_base: float = 2.0, backoff_max: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_rate = self.requests.rate
+        self.max_in_flight = max_in_flight
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.backoff = 0.0
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.waiters: List[tuple] = []      # heap of (priority, seq, tokens, future)
+        self.sequence = itertools.count()
+        self.timer: asyncio.TimerHandle | None = None
+        self.granted = 0
+        self.completed = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, priority: int, tokens: int) -> AsyncIterator[None]:
+        future = asyncio.get_running_loop().create_future()
+        queued_at = time.monotonic()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():    # granted while being cancelled, give the slot back
+                self._release()
+            else:
+                self.waiters = [w for w in self.waiters if w[3] is not future]
+                heapq.heapify(self.waiters)
+            raise
+        waited = time.monotonic() - queued_at
+        self.granted += 1
+        record("llm_queue", waited)
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:        # grant slots in priority order while budget allows
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        while self.waiters and self.in_flight < self.max_in_flight:
+            _, _, tokens, future = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            wait = max(self.paused_until - now, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait > 0:        # head of the queue keeps its place, lower priorities do not overtake it
+                self.timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self.waiters)
+            self.requests.level -= 1
+            self.tokens.level -= min(tokens, self.tokens.capacity)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def record_success(self) -> None:
+        self.completed += 1
+        self.backoff = 0.0
+        self.requests.rate = min(self.max_rate, self.requests.rate + self.max_rate / 10)    # additive recovery
+
+    def record_throttle(self) -> float:
+        """Slow down after a 429/5xx, returns the jittered pause applied to every queued call."""
+        self.throttled += 1
+        self.requests.rate = max(self.max_rate / 16, self.requests.rate / 2)
+        self.backoff = min(self.backoff_max, max(self.backoff_base, self.backoff * 2))
+        pause = random.uniform(self.backoff / 2, self.backoff)      # jitter keeps retries out of lockstep
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.warning(f"LLM throttled, pausing {pause:.1f}s at {self.requests.rate * 60:.0f} requests/min")
+        return pause
+
+    def stats(self) -> Dict[str, float]:
+        queued = [w for w in self.waiters if not w[3].done()]
+        return {
+            "queue_depth": len(queued),
+            "queue_depth_interactive": sum(1 for w in queued if w[0] == INTERACTIVE),
+            "queue_depth_batch": sum(1 for w in queued if w[0] != INTERACTIVE),
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "throttled": self.throttled,
+            "requests_per_minute": round(self.requests.rate * 60, 2),
+            "avg_wait_seconds": round(self.total_wait / max(self.granted, 1), 4),
+            "max_wait_seconds": round(self.max_wait, 4)
+        }
\ No newline at end of file
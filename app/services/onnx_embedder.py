@@ -0,0 +1,72 @@
+from app.core.config import settings
+from loguru import logger
+from pathlib import Path
+from typing import List
+import numpy as np
+
+# ONNX Runtime backend for the sentence-transformers model: same tokenizer, mean pooling and
+# normalization as the PyTorch path, optionally with int8 dynamically quantized weights.
+
+def export_onnx(model_name: str, output_dir: Path, quantize: bool) -> None:
+    """One-off export, needs torch and transformers; serving only needs onnxruntime and the tokenizer."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{model_name}")
+    model = AutoModel.from_pretrained(f"sentence-transformers/{model_name}").eval()
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ("input_ids", "attention_mask", "token_type_ids")}
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            str(output_dir / "model.onnx"),
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={**dynamic_axes, "last_hidden_state": {0: "batch", 1: "sequence"}},
+            opset_version=17
+        )
+    tokenizer.save_pretrained(output_dir)
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(str(output_dir / "model.onnx"), str(output_dir / "model_int8.onnx"), weight_type=QuantType.QInt8)
+    logger.info(f"Exported {model_name} to {output_dir} (int8: {quantize})")
+
+class OnnxEmbedder:
+    def __init__(self, model_dir: Path, quantized: bool, threads: int, max_length: int):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1        # one graph at a time, batching happens upstream
+        model_file = model_dir / ("model_int8.onnx" if quantized else "model.onnx")
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_length = max_length
+        logger.info(f"Loaded ONNX embedding model {model_file}")
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        order = np.argsort([len(text) for text in texts])      # similar lengths per batch, less padding
+        vectors = np.empty((len(texts), settings.embedding_dimension), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            positions = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[i] for i in positions], padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+            )
+            feed = {name: inputs[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)      # mean pooling
+            vectors[positions] = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+def load_onnx_embedder() -> OnnxEmbedder:
+    model_dir = Path(settings.onnx_model_dir)
+    model_file = model_dir / ("model_int8.onnx" if settings.onnx_quantize else "model.onnx")
+    if not model_file.exists():
+        export_onnx(settings.embedding_model, model_dir, settings.onnx_quantize)
+    return OnnxEmbedder(model_dir, settings.onnx_quantize, settings.onnx_threads, settings.embedding_max_seq_length)
\ No newline at end of file
@@ -0,0 +1,89 @@
+from loguru import logger
+from typing import List, Dict, Tuple, Callable
+
+def load_token_counter(model: str) -> Tuple[Callable[[str], int], str]:     # (counter, tokenizer name)
+    try:        # local Gemini tokenizer from google-cloud-aiplatform[tokenization]
+        from vertexai.preview.tokenization import get_tokenizer_for_model
+        tokenizer = get_tokenizer_for_model(model)
+        return (lambda text: tokenizer.count_tokens(text).total_tokens if text else 0), "gemini"
+    except Exception as e:      # the packer is built once at warm-up, so this is logged once per process
+        logger.warning(f"Gemini tokenizer unavailable, estimating tokens from characters: {e}")
+        return (lambda text: (len(text) + 3) // 4), "char_estimate"
+
+def truncate_tokens(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    tokens = count_tokens(text)
+    while tokens > max_tokens and text:
+        text = text[:max(int(len(text) * max_tokens / tokens * 0.95), 0)]     # shrink proportionally, few tokenizer calls
+        tokens = count_tokens(text)
+    return text
+
+def stitch(previous: str, following: str, min_overlap: int = 20) -> str:     # drop text shared through chunk_overlap
+    for size in range(min(len(previous), len(following)), min_overlap - 1, -1):
+        if previous.endswith(following[:size]):
+            return previous + following[size:]
+    return previous + " ... " + following
+
+def merge_section_chunks(matched_sections: List[Dict]) -> List[Dict]:
+    """One block per DPDP section: duplicate chunks dropped, overlapping chunks stitched, best score kept."""
+    sections: Dict[str, Dict] = {}
+    for match in matched_sections:
+        section = sections.setdefault(match["section_number"], {
+            "section_number": match["section_number"], "title": match.get("title", ""), "score": match["score"], "chunks": {}
+        })
+        section["score"] = max(section["score"], match["score"])
+        section["chunks"].setdefault(match["content"], match.get("chunk_index") or 0)
+
+    blocks = []
+    for section in sections.values():
+        content = ""
+        for text in sorted(section["chunks"], key=section["chunks"].get):
+            if text in content:
+                continue
+            content = stitch(content, text) if content else text
+        blocks.append({"section_number": section["section_number"], "title": section["title"],
+                       "score": section["score"], "content": content})
+    return sorted(blocks, key=lambda block: block["score"], reverse=True)
+
+def format_section(block: Dict) -> str:
+    title = f" ({block['title']})" if block["title"] else ""
+    return f"{block['section_number']}{title}: {block['content']}"
+
+class PromptPacker:
+    """Fits document and DPDP Act text into a token budget, most relevant sections first."""
+
+    def __init__(self, model: str, budget: int, document_share: float):
+        self.count_tokens, self.tokenizer = load_token_counter(model)
+        self.budget = budget
+        self.document_share = document_share
+
+    def stats(self) -> Dict:
+        return {"tokenizer": self.tokenizer, "token_budget": self.budget, "document_share": self.document_share}
+
+    def pack(self, document_text: str, matched_sections: List[Dict]) -> Tuple[str, str]:
+        blocks = [(block, format_section(block)) for block in merge_section_chunks(matched_sections)]
+        block_tokens = [self.count_tokens(text) for _, text in blocks]
+        document_tokens = self.count_tokens(document_text)
+
+        # each side gets its share, whatever one side leaves unused goes to the other
+        document_budget = int(self.budget * self.document_share)
+        regulation_budget = max(self.budget - min(document_tokens, document_budget), 0)
+        document_budget = max(self.budget - min(sum(block_tokens), regulation_budget), 0)
+
+        if document_tokens > document_budget:
+            document_text = truncate_tokens(document_text, document_budget, self.count_tokens) + "..."
+            logger.warning(f"Document text truncated from {document_tokens} to {document_budget} tokens")
+
+        packed, used = [], 0
+        for (block, text), tokens in zip(blocks, block_tokens):
+            remaining = regulation_budget - used
+            if tokens > remaining:
+                if remaining >= 64 or not packed:       # partial block rather than nothing
+                    packed.append(truncate_tokens(text, remaining, self.count_tokens) + "...")
+                    logger.warning(f"{block['section_number']} truncated to fit the regulation token budget")
+                dropped = [b["section_number"] for b, _ in blocks[len(packed):]]
+                if dropped:
+                    logger.warning(f"Regulation text over budget, left out lower ranked sections: {', '.join(dropped)}")
+                break
+            packed.append(text)
+            used += tokens
+        return document_text, "\n".join(packed) or "No relevant sections found"
\ No newline at end of file
@@ -0,0 +1,105 @@
+from asyncpg import Pool, Connection
+from app.repository.document import fetch_dpdp_act
+from loguru import logger
+from typing import Awaitable, Callable, List, Dict
+import asyncio
+
+DPDP_ACT_CHANNEL = "dpdp_act_changed"       # NOTIFY channel sent by DPDP Act ingestion
+
+class RegulationCorpus:
+    """The structured DPDP Act held in memory with O(1) lookups by section number and chunk id."""
+
+    def __init__(self):
+        self.sections: Dict[str, Dict] = {}        # section_number -> {title, chapter, content, chunk_ids}
+        self.chunks: Dict[int, Dict] = {}          # chunk id -> {section_number, chunk_index, content}
+        self.chapters: Dict[str, List[str]] = {}   # chapter -> section numbers in Act order
+        self.pool: Pool | None = None
+        self.connect: Callable[[], Awaitable[Connection]] | None = None     # opens the LISTEN connection
+        self.listener: Connection | None = None
+        self.reload_task: asyncio.Task | None = None
+        self.reconnect_task: asyncio.Task | None = None
+        self.dirty = False
+        self.closing = False
+
+    async def load(self, pool: Pool) -> None:
+        sections, chunks, chapters = {}, {}, {}
+        for row in await fetch_dpdp_act(pool):
+            if row["is_chunk"]:
+                chunks[row["id"]] = {
+                    "section_number": row["section_number"],
+                    "chunk_index": row["chunk_index"],
+                    "content": row["content"]
+                }
+            else:
+                sections[row["section_number"]] = {
+                    "title": row["section_title"] or "",
+                    "chapter": row["chapter"] or "",
+                    "content": row["content"],
+                    "chunk_ids": []
+                }
+                chapters.setdefault(row["chapter"] or "", []).append(row["section_number"])
+        for chunk_id, chunk in sorted(chunks.items(), key=lambda item: item[1]["chunk_index"]):
+            if chunk["section_number"] in sections:
+                sections[chunk["section_number"]]["chunk_ids"].append(chunk_id)
+        self.sections, self.chunks, self.chapters = sections, chunks, chapters     # swap in one step
+        logger.info(f"Loaded DPDP Act corpus: {len(sections)} sections, {len(chunks)} chunks")
+
+    def section(self, section_number: str) -> Dict | None:
+        return self.sections.get(section_number)
+
+    def chunk(self, chunk_id: int | str) -> Dict | None:
+        try:
+            return self.chunks.get(int(chunk_id))
+        except (TypeError, ValueError):
+            return None
+
+    async def listen(self, pool: Pool, connect: Callable[[], Awaitable[Connection]]) -> None:    # reload whenever ingestion runs
+        self.pool = pool
+        self.connect = connect
+        await self._subscribe()
+
+    async def _subscribe(self) -> None:
+        connection = await self.connect()
+        await connection.add_listener(DPDP_ACT_CHANNEL, lambda *_: self._request_reload())
+        connection.add_termination_listener(self._on_terminated)
+        self.listener = connection
+
+    def _on_terminated(self, connection: Connection) -> None:
+        if self.listener is connection and not self.closing:
+            self.listener = None
+            self.reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self.closing:
+            try:
+                await self._subscribe()
+            except Exception as e:
+                logger.warning(f"DPDP Act listener reconnect failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+                continue
+            logger.info("DPDP Act listener reconnected")
+            self._request_reload()      # notifications sent while disconnected were lost
+            return
+
+    def _request_reload(self) -> None:
+        self.dirty = True       # a notify during a reload triggers one more pass
+        if self.reload_task is None or self.reload_task.done():
+            self.reload_task = asyncio.create_task(self._reload())
+
+    async def _reload(self) -> None:
+        while self.dirty:
+            self.dirty = False
+            try:
+                await self.load(self.pool)
+            except Exception as e:
+                logger.error(f"Failed to reload DPDP Act corpus: {e}")
+
+    async def close(self) -> None:
+        self.closing = True
+        if self.reconnect_task:
+            self.reconnect_task.cancel()
+        if self.listener:
+            await self.listener.close()
+            self.listener = None
\ No newline at end of file
@@ -0,0 +1,39 @@
+from fastapi import UploadFile
+from app.core.config import settings
+from loguru import logger
+from pathlib import Path
+from typing import Tuple
+import aiofiles
+import hashlib
+import uuid
+
+class UploadTooLargeError(ValueError):
+    pass
+
+async def save_upload(file: UploadFile) -> Tuple[Path, str]:    # stream to a unique temp path, return (path, sha256)
+    upload_dir = Path(settings.upload_dir) / uuid.uuid4().hex    # per-upload directory keeps the original filename
+    upload_dir.mkdir(parents=True)
+    temp_path = upload_dir / Path(file.filename).name
+    max_bytes = settings.max_upload_mb * 1024 * 1024
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while chunk := await file.read(settings.upload_chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {settings.max_upload_mb} MB limit")
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        remove_upload(temp_path)
+        raise
+    logger.debug(f"Saved upload {temp_path} ({size} bytes)")
+    return temp_path, digest.hexdigest()
+
+def remove_upload(temp_path: Path) -> None:
+    temp_path.unlink(missing_ok=True)
+    try:
+        temp_path.parent.rmdir()
+    except OSError as e:
+        logger.warning(f"Could not remove upload directory {temp_path.parent}: {e}")
\ No newline at end of file
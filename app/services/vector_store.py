@@ -0,0 +1,212 @@
+from abc import ABC, abstractmethod
+from app.core.config import settings
+from loguru import logger
+from pathlib import Path
+from typing import List, Dict, Any, TYPE_CHECKING
+import numpy as np
+import asyncio
+import json
+import os
+
+if TYPE_CHECKING:
+    from pinecone import Index
+
+class VectorStore(ABC):
+    """Namespace-aware vector index. Matches are returned as {"id", "score", "metadata"} dicts."""
+
+    def ensure_ready(self) -> None:     # called once at warm-up
+        pass
+
+    @abstractmethod
+    async def upsert(self, vectors: List[Dict], namespace: str) -> None: ...
+
+    @abstractmethod
+    async def query(self, vector: List[float], namespace: str, top_k: int = 10,
+                    filter: Dict[str, Any] | None = None) -> List[Dict]: ...
+
+    @abstractmethod
+    async def delete(self, ids: List[str], namespace: str) -> None: ...
+
+class PineconeVectorStore(VectorStore):
+    def __init__(self):
+        from pinecone import Pinecone       # only loaded when a namespace is served by Pinecone
+        self.pc = Pinecone(api_key=settings.pinecone_api_key)
+        self.index_name = settings.pinecone_index
+        self.index: "Index | None" = None
+
+    def _get_index(self) -> "Index":
+        if not self.index:
+            self.index= self.pc.Index(self.index_name)
+        return self.index
+
+    def ensure_ready(self) -> None:     # create pinecone index once instead of checking on every audit
+        if self.index_name not in self.pc.list_indexes().names():
+            from pinecone import ServerlessSpec
+            self.pc.create_index(
+                name=self.index_name,
+                dimension=settings.embedding_dimension,
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region="us-west-2")
+            )
+            logger.info(f"Created Pinecone index: {self.index_name}")
+        self._get_index()
+
+    async def upsert(self, vectors: List[Dict], namespace: str) -> None:
+        await asyncio.to_thread(self._get_index().upsert, vectors=vectors, namespace=namespace)
+
+    async def query(self, vector: List[float], namespace: str, top_k: int = 10,
+                    filter: Dict[str, Any] | None = None) -> List[Dict]:
+        pinecone_filter = {
+            key: {"$in": value} if isinstance(value, (list, tuple, set)) else {"$eq": value}
+            for key, value in (filter or {}).items()
+        } or None
+        query_result = await asyncio.to_thread(
+            self._get_index().query,
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            namespace=namespace,
+            filter=pinecone_filter
+        )
+        return [
+            {"id": match["id"], "score": match["score"], "metadata": match["metadata"]}
+            for match in query_result["matches"]
+        ]
+
+    async def delete(self, ids: List[str], namespace: str) -> None:
+        if ids:
+            await asyncio.to_thread(self._get_index().delete, ids=ids, namespace=namespace)
+
+class LocalNamespace:
+    """Normalized float32 vectors in a memory-mapped .npy file plus a JSON sidecar with ids and metadata."""
+
+    filter_fields = ("section_number", "chapter")
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.vectors_path = directory / "vectors.npy"
+        self.meta_path = directory / "meta.json"
+        self.vectors = np.empty((0, settings.embedding_dimension), dtype=np.float32)
+        self.ids: List[str] = []
+        self.metadata: List[Dict] = []
+        self.fields: Dict[str, np.ndarray] = {}
+        self.mtime = None
+        self.load()
+
+    def load(self) -> None:
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.vectors = np.load(self.vectors_path, mmap_mode='r')
+        self.ids = meta["ids"]
+        self.metadata = meta["metadata"]
+        self.fields = {       # column arrays so metadata filters are one vectorized comparison
+            field: np.array([str(m.get(field, "")) for m in self.metadata], dtype=object)
+            for field in self.filter_fields
+        }
+        self.mtime = self.meta_path.stat().st_mtime
+        logger.debug(f"Loaded {len(self.ids)} local vectors from {self.directory}")
+
+    def refresh(self) -> None:      # pick up writes made by another process (e.g. the ingest CLI)
+        if self.meta_path.exists() and self.meta_path.stat().st_mtime != self.mtime:
+            self.load()
+
+    def write(self, ids: List[str], vectors: np.ndarray, metadata: List[Dict]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.directory / "vectors.tmp.npy"
+        tmp_meta = self.directory / "meta.tmp.json"
+        np.save(tmp_vectors, np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({"ids": ids, "metadata": metadata}, f)
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_meta, self.meta_path)
+        self.load()
+
+    def upsert(self, vectors: List[Dict]) -> None:
+        positions = {vector_id: i for i, vector_id in enumerate(self.ids)}
+        ids, metadata = list(self.ids), list(self.metadata)
+        matrix = np.array(self.vectors, dtype=np.float32)
+        new_rows = []
+        for vector in vectors:
+            values = normalize(np.asarray(vector["values"], dtype=np.float32))
+            position = positions.get(vector["id"])
+            if position is None:
+                positions[vector["id"]] = len(ids)
+                ids.append(vector["id"])
+                metadata.append(vector.get("metadata", {}))
+                new_rows.append(values)
+            else:
+                matrix[position] = values
+                metadata[position] = vector.get("metadata", {})
+        if new_rows:
+            matrix = np.vstack([matrix, np.stack(new_rows)])
+        self.write(ids, matrix, metadata)
+
+    def delete(self, ids: List[str]) -> None:
+        drop = set(ids)
+        keep = [i for i, vector_id in enumerate(self.ids) if vector_id not in drop]
+        if len(keep) == len(self.ids):
+            return
+        self.write([self.ids[i] for i in keep], np.asarray(self.vectors)[keep], [self.metadata[i] for i in keep])
+
+    def query(self, vector: List[float], top_k: int, filter: Dict[str, Any] | None) -> List[Dict]:
+        if not self.ids:
+            return []
+        scores = self.vectors @ normalize(np.asarray(vector, dtype=np.float32))     # cosine on unit vectors
+        if filter:
+            mask = np.ones(len(self.ids), dtype=bool)
+            for key, value in filter.items():
+                values = [str(v) for v in value] if isinstance(value, (list, tuple, set)) else [str(value)]
+                mask &= np.isin(self.fields[key], values)
+            scores = np.where(mask, scores, -np.inf)
+        top_k = min(top_k, len(self.ids))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ordered = candidates[np.argsort(-scores[candidates])]
+        return [
+            {"id": self.ids[i], "score": float(scores[i]), "metadata": self.metadata[i]}
+            for i in ordered if np.isfinite(scores[i])
+        ]
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class LocalVectorStore(VectorStore):
+    """In-process index for small corpora such as the DPDP Act, no network round trip per query."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.namespaces: Dict[str, LocalNamespace] = {}
+        self.lock = asyncio.Lock()
+
+    def _namespace(self, namespace: str) -> LocalNamespace:
+        if namespace not in self.namespaces:
+            self.namespaces[namespace] = LocalNamespace(self.directory / namespace)
+        return self.namespaces[namespace]
+
+    def ensure_ready(self) -> None:
+        for namespace, backend in settings.vector_store_backends.items():
+            if backend == "local":
+                self._namespace(namespace)
+
+    async def upsert(self, vectors: List[Dict], namespace: str) -> None:
+        async with self.lock:       # upserts rewrite the namespace files, keep them serial
+            await asyncio.to_thread(self._namespace(namespace).upsert, vectors)
+
+    async def query(self, vector: List[float], namespace: str, top_k: int = 10,
+                    filter: Dict[str, Any] | None = None) -> List[Dict]:
+        local = self._namespace(namespace)
+        local.refresh()
+        return local.query(vector, top_k, filter)
+
+    async def delete(self, ids: List[str], namespace: str) -> None:
+        async with self.lock:
+            await asyncio.to_thread(self._namespace(namespace).delete, ids)
+
+def create_vector_store(backend: str) -> VectorStore:
+    if backend == "pinecone":
+        return PineconeVectorStore()
+    if backend == "local":
+        return LocalVectorStore(settings.local_vector_dir)
+    raise ValueError(f"Unknown vector store backend: {backend}")
\ No newline at end of file
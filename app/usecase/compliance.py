@@ -1,75 +1,211 @@
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Dict
+from typing import TypedDict, List, Dict, Tuple, AsyncIterator, Callable
 from asyncpg import Pool
-from pinecone import Pinecone, ServerlessSpec
-from app.services.embedding import embedding_service
-from app.services.llm import llm_service
-from app.repository.document import fetch_document_chunks, insert_audit
+from app.services.embedding import EmbeddingService
+from app.services.llm import LLMService
+from app.services.llm_limiter import INTERACTIVE, BATCH
+from app.services.regulation_corpus import RegulationCorpus
+from app.repository.document import fetch_document_chunks, insert_audit, search_dpdp_chunks
 from app.core.config import settings
+from app.core.metrics import timed, timed_node, RETRIEVAL_FALLBACKS
 from loguru import logger
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import asyncio
 
 class ComplianceState(TypedDict):
     document_id: int
+    filename: str
     document_text: str
     matched_sections: List[Dict]
+    segments: List[Dict]        # map_reduce mode: {"text", "matched_sections"} per document segment
     audit_result: Dict
     pool: Pool
+    embedding_service: EmbeddingService
+    llm_service: LLMService
+    regulation_corpus: RegulationCorpus
+    on_token: Callable[[str, int], None] | None     # streaming audits: receives (LLM text, segment index)
+    priority: int       # LLM queue priority, interactive requests go ahead of batch work
 
-async def retrieve_node(state: ComplianceState) -> ComplianceState:
-    pc = Pinecone(api_key=settings.pinecone_api_key)
-    index_name = "compliguard-index"
-    if index_name not in pc.list_indexes().names():
-        pc.create_index(
-            name=index_name,
-            dimension=384,
-            metric="cosine",
-            spec=ServerlessSpec(cloud="aws", region="us-west-2")
-        )
-        logger.info(f"Created Pinecone index: {index_name}")
+def corpus_section(chunk_id: str, corpus: RegulationCorpus, score: float, metadata: Dict | None = None) -> Dict | None:
+    chunk = corpus.chunk(chunk_id)      # full chunk text from the in-memory corpus
+    if chunk:
+        section = corpus.section(chunk["section_number"]) or {}
+        return {
+            "section_number": chunk["section_number"],
+            "title": section.get("title", ""),
+            "chunk_id": int(chunk_id),
+            "chunk_index": chunk["chunk_index"],
+            "content": chunk["content"],
+            "score": score
+        }
+    if not metadata or "content" not in metadata:
+        return None
+    return {
+        "section_number": metadata["section_number"],
+        "title": "",
+        "chunk_id": None,
+        "chunk_index": metadata.get("chunk_index"),
+        "content": metadata["content"],     # truncated copy stored with the vector
+        "score": score
+    }
 
-    chunks = await fetch_document_chunks(state["pool"], state["document_id"])
-    if not chunks:
-        raise ValueError(f"No chunks for document_id: {state['document_id']}")
+def fuse_matches(vector: List[Dict], lexical: List[Dict], corpus: RegulationCorpus) -> List[Dict]:
+    """Reciprocal-rank fusion of vector and lexical hits. Vector-only hits still need retrieval_min_score."""
+    k = settings.retrieval_rrf_k
+    scores: Dict[str, float] = {}
+    for rank, match in enumerate(vector, 1):
+        scores[str(match["id"])] = scores.get(str(match["id"]), 0.0) + 1 / (k + rank)
+    for rank, row in enumerate(lexical, 1):
+        scores[str(row["id"])] = scores.get(str(row["id"]), 0.0) + 1 / (k + rank)
+
+    vector_hits = {str(match["id"]): match for match in vector}
+    lexical_ids = {str(row["id"]) for row in lexical}
+    sections = []
+    for chunk_id in sorted(scores, key=scores.get, reverse=True):
+        hit = vector_hits.get(chunk_id)
+        if chunk_id not in lexical_ids and hit["score"] <= settings.retrieval_min_score:
+            continue
+        section = corpus_section(chunk_id, corpus, scores[chunk_id], hit["metadata"] if hit else None)
+        if section:
+            sections.append(section)
+        if len(sections) == settings.retrieval_top_k:
+            break
+    return sections
+
+async def vector_matches(embedding_service: EmbeddingService, texts: List[str],
+                         query_timeout: float | None = None) -> List[List[Dict]]:
+    with timed("retrieve_vector"):
+        embeddings = await embedding_service.generate_embeddings(texts)     # one batched encode for all texts
+        results = await asyncio.wait_for(asyncio.gather(*[      # the timeout covers the index queries, not the encode
+            embedding_service.query_embeddings(embedding, namespace="dpdp_act", top_k=settings.retrieval_top_k)
+            for embedding in embeddings
+        ]), query_timeout)
+    return [[match for match in matches if not match["metadata"]["section_number"].startswith("Chunk_")] for matches in results]
+
+async def lexical_matches(pool: Pool, texts: List[str]) -> List[List[Dict]]:
+    with timed("retrieve_lexical"):
+        return await asyncio.gather(*[search_dpdp_chunks(pool, text, settings.retrieval_top_k) for text in texts])
 
+async def match_sections(embedding_service: EmbeddingService, corpus: RegulationCorpus, pool: Pool,
+                         texts: List[str]) -> List[List[Dict]]:
+    mode = settings.retrieval_mode      # "hybrid", "vector" or "lexical"
+    empty = [[] for _ in texts]
+    lexical_task = asyncio.create_task(lexical_matches(pool, texts)) if mode != "vector" else None
+    vector = empty
+    try:
+        if mode == "vector":
+            vector = await vector_matches(embedding_service, texts)
+        elif mode == "hybrid":
+            vector = await vector_matches(embedding_service, texts, settings.retrieval_vector_timeout_seconds)
+    except Exception as e:
+        if mode == "vector":
+            raise
+        RETRIEVAL_FALLBACKS.labels("vector").inc()
+        logger.warning(f"Vector retrieval unavailable, using lexical matches only: {type(e).__name__} {e}")
+
+    lexical = empty
+    if lexical_task:
+        try:
+            lexical = await lexical_task
+        except Exception as e:
+            if mode == "lexical" or vector is empty:
+                raise
+            RETRIEVAL_FALLBACKS.labels("lexical").inc()
+            logger.warning(f"Lexical retrieval failed, using vector matches only: {e}")
+    return [fuse_matches(v, l, corpus) for v, l in zip(vector, lexical)]
+
+def merge_sections(section_lists: List[List[Dict]]) -> List[Dict]:     # best score per section chunk
+    merged = {}
+    for sections in section_lists:
+        for section in sections:
+            key = (section["section_number"], section["content"])
+            if key not in merged or section["score"] > merged[key]["score"]:
+                merged[key] = section
+    return sorted(merged.values(), key=lambda section: section["score"], reverse=True)
+
+def segment_document(chunks: List[Dict]) -> Tuple[str, List[str]]:     # (document_text, retrieval query texts)
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
     full_text = "\n".join(chunk["chunk_text"] for chunk in chunks)
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=10000, chunk_overlap=500)
-    state["document_text"] = "\n".join(text_splitter.split_text(full_text)[:2])
-
-    embeddings = await embedding_service.generate_embeddings([state["document_text"]])
-    index = pc.Index(index_name)
-    query_result = index.query(
-        vector=embeddings[0],
-        top_k=10,
-        include_metadata=True,
-        namespace="dpdp_act"
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.audit_segment_size, chunk_overlap=settings.audit_segment_overlap
     )
+    segments = text_splitter.split_text(full_text)
+    if settings.audit_mode == "map_reduce":     # every segment gets its own retrieval and analysis
+        return full_text, segments
+    document_text = "\n".join(segments[:2])
+    return document_text, [document_text]
 
-    state["matched_sections"] = [
-        {
-            "section_number": match["metadata"]["section_number"],
-            "content": match["metadata"].get("content", ""),
-            "score": match["score"]
-        }
-        for match in query_result["matches"]
-        if not match["metadata"]["section_number"].startswith("Chunk_") and
-        "content" in match["metadata"] and
-        match["score"] > 0.75
-    ]
+def apply_matches(state: ComplianceState, document_text: str, query_texts: List[str],
+                  matched: List[List[Dict]]) -> ComplianceState:
+    state["document_text"] = document_text
+    if settings.audit_mode == "map_reduce":
+        state["segments"] = [{"text": text, "matched_sections": sections} for text, sections in zip(query_texts, matched)]
+        state["matched_sections"] = merge_sections(matched)
+    else:
+        state["segments"] = []
+        state["matched_sections"] = matched[0]
+    return state
+
+async def retrieve_node(state: ComplianceState) -> ComplianceState:
+    chunks = await fetch_document_chunks(state["pool"], state["document_id"])
+    if not chunks:
+        raise ValueError(f"No chunks for document_id: {state['document_id']}")
+
+    state["filename"] = chunks[0]["filename"]
+    document_text, query_texts = segment_document(chunks)
+    matched = await match_sections(state["embedding_service"], state["regulation_corpus"], state["pool"], query_texts)
+    apply_matches(state, document_text, query_texts, matched)
     logger.info(f"Retrieved {len(state['matched_sections'])} DPDP Act sections for document_id: {state['document_id']}")
     return state
 
+def merge_lines(texts: List[str]) -> str:      # union of bullet lines across segments, order kept
+    lines = {}
+    for text in texts:
+        for line in text.split("\n"):
+            line = line.strip()
+            if line and line.lstrip("-* ").lower() != "none":
+                lines.setdefault(line.lstrip("-* ").lower(), line)
+    return "\n".join(lines.values()) or "None"
+
+def reduce_results(results: List[Dict]) -> Dict:
+    return {
+        "compliance_status": all(result["compliance_status"] for result in results),
+        "gaps": merge_lines([result["gaps"] for result in results]),
+        "suggestions": merge_lines([result["suggestions"] for result in results])
+    }
+
+def segment_sink(on_token: Callable[[str, int], None] | None, index: int) -> Callable[[str], None] | None:
+    return (lambda text: on_token(text, index)) if on_token else None
+
+async def analyze_segments(llm_service: LLMService, segments: List[Dict],
+                           on_token: Callable[[str, int], None] | None = None, priority: int = INTERACTIVE) -> Dict:
+    semaphore = asyncio.Semaphore(settings.audit_max_concurrency)
+
+    async def analyze_segment(index: int, segment: Dict) -> Dict:
+        async with semaphore:
+            return await llm_service.analyze_compliance(
+                document_text=segment["text"],
+                matched_sections=segment["matched_sections"],
+                on_token=segment_sink(on_token, index),
+                priority=priority
+            )
+
+    results = await asyncio.gather(*[analyze_segment(index, segment) for index, segment in enumerate(segments)])
+    logger.info(f"Merged compliance results of {len(results)} document segments")
+    return reduce_results(results)
+
 async def analyze_node(state: ComplianceState) -> ComplianceState:
     """Analyze document compliance with DPDP Act."""
-    regulation_text = "\n".join(
-        f"{match['section_number']}: {match['content']}" for match in state["matched_sections"]
-    ) or "No relevant sections found"
-
-    result = await llm_service.analyze_compliance(
-        document_text=state["document_text"],
-        regulation_text=regulation_text
-    )
-    dpdp_section = ", ".join(m["section_number"] for m in state["matched_sections"]) or "None"
+    if state["segments"]:
+        result = await analyze_segments(
+            state["llm_service"], state["segments"], state.get("on_token"), state.get("priority", INTERACTIVE)
+        )
+    else:
+        result = await state["llm_service"].analyze_compliance(
+            document_text=state["document_text"],
+            matched_sections=state["matched_sections"],
+            on_token=segment_sink(state.get("on_token"), 0),
+            priority=state.get("priority", INTERACTIVE)
+        )
+    dpdp_section = ", ".join(dict.fromkeys(m["section_number"] for m in state["matched_sections"])) or "None"
     if len(dpdp_section) > 500:
         dpdp_section = dpdp_section[:497] + "..."
 
@@ -96,16 +232,75 @@ async def store_node(state: ComplianceState) -> ComplianceState:
     logger.info(f"Stored audit for document_id: {state['document_id']}")
     return state
 
+def initial_state(document_id: int, pool: Pool, embedding_service: EmbeddingService,
+                  llm_service: LLMService, regulation_corpus: RegulationCorpus,
+                  on_token: Callable[[str, int], None] | None = None, priority: int = INTERACTIVE) -> ComplianceState:
+    return {
+        "document_id": document_id,
+        "filename": "",
+        "document_text": "",
+        "matched_sections": [],
+        "segments": [],
+        "audit_result": {},
+        "pool": pool,
+        "embedding_service": embedding_service,
+        "llm_service": llm_service,
+        "regulation_corpus": regulation_corpus,
+        "on_token": on_token,
+        "priority": priority
+    }
+
+async def audit_documents(document_ids: List[int], pool: Pool, embedding_service: EmbeddingService,
+                          llm_service: LLMService, regulation_corpus: RegulationCorpus) -> AsyncIterator[Tuple[int, str | None, Dict | None, str | None]]:
+    """Audit many documents with one batched encode, yielding (document_id, filename, audit_result, error) as each finishes."""
+    fetched = await asyncio.gather(
+        *[fetch_document_chunks(pool, document_id) for document_id in document_ids], return_exceptions=True
+    )
+    prepared = []
+    for document_id, chunks in zip(document_ids, fetched):
+        if isinstance(chunks, Exception):
+            yield document_id, None, None, str(chunks)
+            continue
+        document_text, query_texts = segment_document(chunks)
+        prepared.append((document_id, chunks[0]["filename"], document_text, query_texts))
+
+    unique_texts = list(dict.fromkeys(text for *_, query_texts in prepared for text in query_texts))
+    with timed("node_retrieve"):
+        matches = dict(zip(unique_texts, await match_sections(embedding_service, regulation_corpus, pool, unique_texts)))     # shared across documents
+    semaphore = asyncio.Semaphore(settings.audit_max_concurrency)
+
+    async def run(document_id: int, filename: str, document_text: str, query_texts: List[str]):
+        try:
+            state = initial_state(document_id, pool, embedding_service, llm_service, regulation_corpus, priority=BATCH)
+            state["filename"] = filename
+            apply_matches(state, document_text, query_texts, [matches[text] for text in query_texts])
+            async with semaphore:
+                state = await timed_node("analyze", analyze_node)(state)
+            state = await timed_node("store", store_node)(state)
+            return document_id, filename, state["audit_result"], None
+        except Exception as e:
+            logger.error(f"Batch audit failed for document_id {document_id}: {e}")
+            return document_id, filename, None, str(e)
+
+    tasks = [asyncio.create_task(run(*item)) for item in prepared]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:      # consumer went away (streaming client disconnected), stop the remaining audits
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    logger.info(f"Completed batch audit of {len(document_ids)} documents")
+
 def build_compliance_graph():
     """Build LangGraph compliance workflow."""
+    from langgraph.graph import StateGraph, END     # imported at warm-up, keeps app import fast
     graph = StateGraph(ComplianceState)
-    graph.add_node("retrieve", retrieve_node)
-    graph.add_node("analyze", analyze_node)
-    graph.add_node("store", store_node)
+    graph.add_node("retrieve", timed_node("retrieve", retrieve_node))
+    graph.add_node("analyze", timed_node("analyze", analyze_node))
+    graph.add_node("store", timed_node("store", store_node))
     graph.add_edge("retrieve", "analyze")
     graph.add_edge("analyze", "store")
     graph.add_edge("store", END)
     graph.set_entry_point("retrieve")
-    return graph.compile()
-
-compliance_graph = build_compliance_graph()
\ No newline at end of file
+    return graph.compile()
\ No newline at end of file
@@ -1,9 +1,17 @@
 from asyncpg import Pool
 from app.services.document_parser import parse_user_doc
+from app.services.embedding import EmbeddingService
+from app.repository.document import fetch_document_id_by_hash
 from loguru import logger
-from typing import List
+from typing import Tuple
 
-async def upload_document(file_path: str, pool: Pool) -> List[int]:
+async def upload_document(file_path: str, pool: Pool, embedding_service: EmbeddingService,
+                          content_hash: str, force: bool = False) -> Tuple[int, bool]:
+    if not force:
+        document_id = await fetch_document_id_by_hash(pool, content_hash)
+        if document_id:        # same bytes already parsed, embedded and stored
+            logger.info(f"Skipping duplicate upload {file_path}, matches document {document_id}")
+            return document_id, True
     logger.info(f"Uploading document: {file_path}")
-    document_ids = await parse_user_doc(file_path, pool)
-    return document_ids
\ No newline at end of file
+    document_id = await parse_user_doc(file_path, pool, embedding_service, content_hash)
+    return document_id, False
\ No newline at end of file
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+from typing import Dict
+import argparse
+import json
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+def direction(metric: str) -> int:      # +1 higher is better, -1 lower is better, 0 informational
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith("_ms") or metric.endswith("seconds"):
+        return -1
+    return 0
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> int:
+    before, after = flatten(baseline["results"]), flatten(candidate["results"])
+    print(f"{'metric':<45} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    regressions = 0
+    for metric in sorted(before.keys() & after.keys()):
+        old, new = before[metric], after[metric]
+        change = (new - old) / old * 100 if old else 0.0
+        sign = direction(metric)
+        regressed = sign != 0 and -sign * change > threshold
+        regressions += regressed
+        print(f"{metric:<45} {old:>12.2f} {new:>12.2f} {change:>+8.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+    baseline, candidate = (json.loads(Path(path).read_text()) for path in (args.baseline, args.candidate))
+    print(f"baseline {baseline['meta'].get('commit')}  candidate {candidate['meta'].get('commit')}")
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print(f"{regressions} metrics regressed by more than {args.threshold}%")
+    sys.exit(1 if regressions else 0)
\ No newline at end of file
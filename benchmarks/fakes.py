@@ -0,0 +1,211 @@
+from app.services.vector_store import VectorStore, normalize
+from types import SimpleNamespace
+from typing import List, Dict, Any, AsyncIterator
+import numpy as np
+import itertools
+import importlib
+import asyncio
+import hashlib
+import re
+
+REPOSITORY_FUNCTIONS = (
+    "fetch_dpdp_act_index", "fetch_dpdp_act", "upsert_dpdp_section", "delete_dpdp_sections", "notify_dpdp_act_changed",
+    "mark_dpdp_sections_embedded",
+    "insert_document", "insert_document_chunks", "set_document_hash", "delete_document", "fetch_document_chunks", "insert_audit",
+    "search_dpdp_chunks"
+)
+PATCHED_MODULES = (     # modules that import repository functions by name
+    "app.repository.document", "app.services.document_parser", "app.services.regulation_corpus", "app.usecase.compliance"
+)
+
+class MemoryRepository:
+    """In-memory stand-in for the Postgres repository functions used by ingest and audit."""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.dpdp_act: Dict[int, Dict] = {}
+        self.documents: Dict[int, Dict] = {}
+        self.document_chunks: Dict[int, List[Dict]] = {}
+        self.audits: List[Dict] = []
+
+    def install(self) -> None:
+        for module_name in PATCHED_MODULES:
+            module = importlib.import_module(module_name)
+            for name in REPOSITORY_FUNCTIONS:
+                if hasattr(module, name):
+                    setattr(module, name, getattr(self, name))
+
+    async def fetch_dpdp_act_index(self, pool) -> List[Dict]:
+        keys = ("id", "section_number", "is_chunk", "chunk_index", "content_hash")
+        return [{key: row[key] for key in keys} for row in self.dpdp_act.values()]
+
+    async def fetch_dpdp_act(self, pool) -> List[Dict]:
+        return [dict(row) for _, row in sorted(self.dpdp_act.items())]
+
+    async def upsert_dpdp_section(self, pool, section_number: str, section_title: str, chapter: str, content: str,
+                                  chunks: List[Dict], removed_chunk_indexes: List[int]) -> Dict[int, int]:
+        rows = {row["chunk_index"]: row for row in self.dpdp_act.values() if row["section_number"] == section_number}
+
+        def upsert(chunk_index: int | None, text: str) -> int:
+            row = rows.get(chunk_index)
+            if row is None:
+                row = {"id": next(self.ids), "section_number": section_number, "is_chunk": chunk_index is not None,
+                       "chunk_index": chunk_index}
+                self.dpdp_act[row["id"]] = row
+            row.update(section_title=section_title, chapter=chapter, content=text, content_hash=None)
+            return row["id"]
+
+        upsert(None, content)
+        chunk_ids = {chunk["chunk_index"]: upsert(chunk["chunk_index"], chunk["content"]) for chunk in chunks}
+        for index in removed_chunk_indexes:
+            if index in rows:
+                self.dpdp_act.pop(rows[index]["id"], None)
+        return chunk_ids
+
+    async def mark_dpdp_sections_embedded(self, pool, sections: List[Dict]) -> None:
+        hashes = {(section["section_number"], None): section["content_hash"] for section in sections}
+        hashes.update(
+            ((section["section_number"], chunk["chunk_index"]), chunk["content_hash"])
+            for section in sections for chunk in section["chunks"]
+        )
+        for row in self.dpdp_act.values():
+            key = (row["section_number"], row["chunk_index"])
+            if key in hashes:
+                row["content_hash"] = hashes[key]
+
+    async def delete_dpdp_sections(self, pool, section_numbers: List[str]) -> None:
+        drop = set(section_numbers)
+        self.dpdp_act = {row_id: row for row_id, row in self.dpdp_act.items() if row["section_number"] not in drop}
+
+    async def notify_dpdp_act_changed(self, pool) -> None:
+        pass
+
+    async def search_dpdp_chunks(self, pool, query_text: str, limit: int) -> List[Dict]:     # word overlap ranking
+        words = set(re.findall(r"\w+", query_text.lower()))
+        ranked = []
+        for row in self.dpdp_act.values():
+            if row["is_chunk"]:
+                overlap = len(words & set(re.findall(r"\w+", row["content"].lower())))
+                if overlap:
+                    ranked.append({"id": row["id"], "section_number": row["section_number"], "rank": float(overlap)})
+        return sorted(ranked, key=lambda row: row["rank"], reverse=True)[:limit]
+
+    async def insert_document(self, pool, filename: str) -> int:
+        document_id = next(self.ids)
+        self.documents[document_id] = {"filename": filename, "content_hash": None}
+        self.document_chunks[document_id] = []
+        return document_id
+
+    async def set_document_hash(self, pool, document_id: int, content_hash: str) -> None:
+        self.documents[document_id]["content_hash"] = content_hash
+
+    async def insert_document_chunks(self, pool, document_id: int, first_index: int, chunks: List[str]) -> List[int]:
+        ids = [next(self.ids) for _ in chunks]
+        self.document_chunks[document_id].extend(
+            {"id": chunk_id, "chunk_index": idx, "chunk_text": chunk}
+            for idx, (chunk_id, chunk) in enumerate(zip(ids, chunks), first_index)
+        )
+        return ids
+
+    async def delete_document(self, pool, document_id: int) -> None:
+        self.documents.pop(document_id, None)
+        self.document_chunks.pop(document_id, None)
+
+    async def fetch_document_chunks(self, pool, document_id: int) -> List[Dict]:
+        if not self.document_chunks.get(document_id):
+            raise ValueError(f"Document ID {document_id} not found")
+        filename = self.documents[document_id]["filename"]
+        return [{"filename": filename, **chunk} for chunk in self.document_chunks[document_id]]
+
+    async def insert_audit(self, pool, document_id: int, dpdp_section: str, compliance_status: bool,
+                           gaps: str, suggestions: str) -> None:
+        self.audits.append({"document_id": document_id, "dpdp_section": dpdp_section,
+                            "compliance_status": compliance_status, "gaps": gaps, "suggestions": suggestions})
+
+class MemoryVectorStore(VectorStore):
+    """Brute-force cosine search over NumPy arrays, nothing written to disk."""
+
+    def __init__(self):
+        self.namespaces: Dict[str, Dict[str, tuple]] = {}      # namespace -> id -> (vector, metadata)
+        self.matrices: Dict[str, tuple] = {}                  # namespace -> (ids, matrix), rebuilt after writes
+
+    async def upsert(self, vectors: List[Dict], namespace: str) -> None:
+        entries = self.namespaces.setdefault(namespace, {})
+        for vector in vectors:
+            entries[vector["id"]] = (normalize(np.asarray(vector["values"], dtype=np.float32)), vector.get("metadata", {}))
+        self.matrices.pop(namespace, None)
+
+    async def query(self, vector: List[float], namespace: str, top_k: int = 10,
+                    filter: Dict[str, Any] | None = None) -> List[Dict]:
+        entries = self.namespaces.get(namespace)
+        if not entries:
+            return []
+        if namespace not in self.matrices:
+            ids = list(entries)
+            self.matrices[namespace] = (ids, np.stack([entries[vector_id][0] for vector_id in ids]))
+        ids, matrix = self.matrices[namespace]
+        scores = matrix @ normalize(np.asarray(vector, dtype=np.float32))
+        matches = []
+        for i in np.argsort(-scores):
+            metadata = entries[ids[i]][1]
+            if all(metadata.get(key) in (value if isinstance(value, (list, tuple, set)) else [value])
+                   for key, value in (filter or {}).items()):
+                matches.append({"id": ids[i], "score": float(scores[i]), "metadata": metadata})
+                if len(matches) == top_k:
+                    break
+        return matches
+
+    async def delete(self, ids: List[str], namespace: str) -> None:
+        entries = self.namespaces.get(namespace, {})
+        for vector_id in ids:
+            entries.pop(vector_id, None)
+        self.matrices.pop(namespace, None)
+
+class HashingEncoder:
+    """Deterministic bag-of-words embeddings: texts sharing words get high cosine similarity, no model needed."""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            h = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), "little")
+            vector[h % self.dimension] += 1.0 if h >> 63 else -1.0
+        return normalize(vector)
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.stack([self.encode_one(text) for text in texts])
+
+    async def close(self) -> None:
+        pass
+
+class FakeChatModel:
+    """Stands in for ChatGoogleGenerativeAI: answers in the audit format after a latency derived from the prompt."""
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    def respond(self, prompt: str) -> tuple:
+        h = int.from_bytes(hashlib.sha256(prompt.encode('utf-8')).digest()[:8], "little")
+        compliant = h % 2 == 0
+        text = (
+            f"- Compliance Status: {compliant}\n"
+            f"- Gaps: {'None' if compliant else '- No notice is given before personal data is processed'}\n"
+            f"- Suggestions: {'None' if compliant else '- Give a notice describing the data and purpose'}"
+        )
+        return text, self.latency_ms * (0.5 + (h % 1000) / 1000) / 1000     # 0.5x to 1.5x the base latency
+
+    async def ainvoke(self, prompt: str) -> SimpleNamespace:
+        text, delay = self.respond(prompt)
+        await asyncio.sleep(delay)
+        return SimpleNamespace(content=text)
+
+    async def astream(self, prompt: str) -> AsyncIterator[SimpleNamespace]:
+        text, delay = self.respond(prompt)
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(delay / len(words))
+            yield SimpleNamespace(content=word if i == 0 else " " + word)
\ No newline at end of file
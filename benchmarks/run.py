@@ -0,0 +1,186 @@
+import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))      # run as `python benchmarks/run.py`
+
+for key in ("POSTGRES_PASSWORD", "PINECONE_API_KEY", "GOOGLE_API_KEY"):     # required by Settings, never used offline
+    os.environ.setdefault(key, "offline")
+
+from app.core.config import settings
+from benchmarks.fakes import MemoryRepository, MemoryVectorStore, HashingEncoder, FakeChatModel
+from loguru import logger
+from datetime import datetime, timezone
+from typing import List, Dict
+import numpy as np
+import subprocess
+import argparse
+import asyncio
+import json
+import time
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {
+        "runs": len(samples),
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "max_ms": round(float(values.max()), 2)
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+class Bench:
+    """Services wired for offline runs: fake LLM, in-memory vectors, Postgres or an in-memory repository."""
+
+    async def setup(self, args) -> None:
+        settings.embedding_cache_enabled = False        # measure the pipeline, not cache hits
+        settings.audit_cache_enabled = False
+        settings.vector_store_backends = {"dpdp_act": "memory", "documents": "memory"}
+        settings.llm_requests_per_minute = args.llm_rpm
+        if args.fake_embeddings:
+            settings.use_embedding_server = True        # skips loading the model, the encoder is replaced below
+
+        from app.services.embedding import EmbeddingService
+        from app.services.llm import LLMService
+        from app.services.regulation_corpus import RegulationCorpus
+        from app.usecase.compliance import build_compliance_graph
+
+        if args.dsn:
+            import asyncpg
+            self.pool = await asyncpg.create_pool(args.dsn, min_size=1, max_size=10)
+        else:
+            self.pool = None
+            MemoryRepository().install()
+
+        self.embedding_service = EmbeddingService()
+        if args.fake_embeddings:
+            self.embedding_service.encoder = HashingEncoder(settings.embedding_dimension)
+        self.embedding_service.vector_stores["memory"] = MemoryVectorStore()
+        self.llm_service = LLMService()
+        self.llm_service.llm = FakeChatModel(args.llm_latency_ms)
+        self.regulation_corpus = RegulationCorpus()
+        self.graph = build_compliance_graph()
+
+    async def close(self) -> None:
+        from app.services.extraction import shutdown_executor
+        await self.embedding_service.close()
+        shutdown_executor()
+        if self.pool:
+            await self.pool.close()
+
+    async def ingest_dpdp(self, file_path: str) -> Dict:
+        from app.services.document_parser import parse_dpdp_act
+        start = time.perf_counter()
+        plan = await parse_dpdp_act(file_path, self.pool, self.embedding_service, full=True)
+        seconds = time.perf_counter() - start
+        chunks = sum(len(change["changed_chunks"]) for change in plan["changes"])
+        await self.regulation_corpus.load(self.pool)
+        return {"sections": len(plan["changes"]), "chunks": chunks, "seconds": round(seconds, 4),
+                "chunks_per_sec": round(chunks / seconds, 2)}
+
+    async def ingest_document(self, file_path: str, runs: int) -> Dict:
+        from app.services.document_parser import parse_user_doc
+        from app.repository import document as repository
+        samples, chunks = [], 0
+        for _ in range(runs):
+            start = time.perf_counter()
+            self.document_id = await parse_user_doc(file_path, self.pool, self.embedding_service)
+            samples.append(time.perf_counter() - start)
+            chunks += len(await repository.fetch_document_chunks(self.pool, self.document_id))
+        return {"chunks_per_run": chunks // runs, "chunks_per_sec": round(chunks / sum(samples), 2), **latency_stats(samples)}
+
+    async def embedding_throughput(self, texts: List[str], batch_sizes: List[int]) -> Dict:
+        encoder = self.embedding_service.encoder
+        await encoder.encode(texts[:8])     # first call allocates buffers
+        results = {}
+        for batch_size in batch_sizes:
+            start = time.perf_counter()
+            for offset in range(0, len(texts), batch_size):
+                await encoder.encode(texts[offset:offset + batch_size])
+            results[f"batch_{batch_size}"] = {"texts_per_sec": round(len(texts) / (time.perf_counter() - start), 2)}
+        return results
+
+    async def audit_once(self) -> float:
+        from app.usecase.compliance import initial_state
+        start = time.perf_counter()
+        await self.graph.ainvoke(initial_state(
+            self.document_id, self.pool, self.embedding_service, self.llm_service, self.regulation_corpus
+        ))
+        return time.perf_counter() - start
+
+    async def audit_latency(self, runs: int) -> Dict:
+        await self.audit_once()     # warm-up
+        return latency_stats([await self.audit_once() for _ in range(runs)])
+
+    async def audit_scaling(self, levels: List[int], rounds: int) -> Dict:
+        results = {}
+        for level in levels:
+            async def worker() -> List[float]:
+                return [await self.audit_once() for _ in range(rounds)]
+
+            start = time.perf_counter()
+            samples = [sample for batch in await asyncio.gather(*[worker() for _ in range(level)]) for sample in batch]
+            results[f"concurrency_{level}"] = {
+                "audits_per_sec": round(len(samples) / (time.perf_counter() - start), 2), **latency_stats(samples)
+            }
+        return results
+
+async def main(args) -> Dict:
+    from app.services.document_parser import parse_dpdp_sections
+    from app.services.embedding_engine import embedding_model_id
+    bench = Bench()
+    await bench.setup(args)
+    results = {}
+    try:
+        results["ingest_dpdp"] = await bench.ingest_dpdp(args.dpdp_file)
+        results["ingest_document"] = await bench.ingest_document(args.document, args.ingest_runs)
+        sections = await parse_dpdp_sections(args.dpdp_file)
+        texts = [chunk["content"] for section in sections for chunk in section["chunks"]]
+        texts = (texts * (args.embedding_texts // max(len(texts), 1) + 1))[:args.embedding_texts]
+        results["embedding"] = await bench.embedding_throughput(texts, args.batch_sizes)
+        results["audit"] = await bench.audit_latency(args.audit_runs)
+        results["audit_scaling"] = await bench.audit_scaling(args.concurrency, args.rounds)
+    finally:
+        await bench.close()
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": "postgres" if args.dsn else "memory",
+            "embeddings": "hashing" if args.fake_embeddings else embedding_model_id(),
+            "llm_latency_ms": args.llm_latency_ms,
+            "audit_mode": settings.audit_mode
+        },
+        "results": results
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline ingest and audit benchmarks, no network calls")
+    parser.add_argument("--dsn", help="Postgres DSN of a scratch database with the schema, default is in-memory")
+    parser.add_argument("--dpdp-file", default="data/dpdp_act.txt")
+    parser.add_argument("--document", default="data/Testing_dpdp.pdf")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Hashing encoder instead of the embedding model")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Mean latency of the fake LLM")
+    parser.add_argument("--llm-rpm", type=int, default=1_000_000, help="Limiter requests/min, high by default")
+    parser.add_argument("--ingest-runs", type=int, default=5)
+    parser.add_argument("--embedding-texts", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64, 128])
+    parser.add_argument("--audit-runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rounds", type=int, default=3, help="Audits per concurrent worker")
+    parser.add_argument("--output", help="Results file, default benchmarks/results/<commit>.json")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    report = asyncio.run(main(args))
+    output = Path(args.output or f"benchmarks/results/{report['meta']['commit'] or 'latest'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report["results"], indent=2))
+    print(f"Wrote {output}")
\ No newline at end of file
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))      # run as `python scripts/embedding_parity.py`
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.services.document_parser import parse_dpdp_sections
+from app.services.onnx_embedder import OnnxEmbedder, export_onnx
+from loguru import logger
+from typing import List, Dict
+import numpy as np
+import argparse
+import asyncio
+import time
+
+def timed_encode(encode, texts: List[str]) -> tuple:
+    encode(texts[:8])       # warm-up
+    start = time.perf_counter()
+    vectors = encode(texts)
+    return vectors, len(texts) / (time.perf_counter() - start)
+
+def parity(reference: np.ndarray, candidate: np.ndarray, top_k: int) -> Dict[str, float]:
+    cosine = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    # retrieval agreement: each text queries the corpus, compare the top-k neighbours of both backends
+    ref_top = np.argsort(-(reference @ reference.T), axis=1)[:, 1:top_k + 1]
+    cand_top = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1:top_k + 1]
+    overlap = np.mean([len(set(a) & set(b)) / top_k for a, b in zip(ref_top, cand_top)])
+    return {
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min()),
+        "max_drift": float(1 - cosine.min()),
+        f"top{top_k}_overlap": float(overlap)
+    }
+
+def main(file_path: str, batch_size: int, threads: int, top_k: int) -> None:
+    from sentence_transformers import SentenceTransformer
+    sections = asyncio.run(parse_dpdp_sections(file_path))
+    texts = [chunk["content"] for section in sections for chunk in section["chunks"]]
+    model_dir = Path(settings.onnx_model_dir)
+    if not (model_dir / "model.onnx").exists() or not (model_dir / "model_int8.onnx").exists():
+        export_onnx(settings.embedding_model, model_dir, quantize=True)
+
+    model = SentenceTransformer(settings.embedding_model)
+    reference, torch_rate = timed_encode(
+        lambda batch: model.encode(batch, batch_size=batch_size, convert_to_numpy=True), texts
+    )
+    print(f"{len(texts)} DPDP Act chunks, batch size {batch_size}")
+    print(f"{'backend':<12} {'texts/s':>9} {'speedup':>8} {'mean cos':>9} {'min cos':>9} {'max drift':>10} {f'top{top_k}':>7}")
+    print(f"{'torch':<12} {torch_rate:>9.1f} {1.0:>7.2f}x")
+    for name, quantized in (("onnx", False), ("onnx-int8", True)):
+        embedder = OnnxEmbedder(model_dir, quantized, threads, settings.embedding_max_seq_length)
+        vectors, rate = timed_encode(lambda batch: embedder.encode(batch, batch_size), texts)
+        result = parity(reference, vectors, top_k)
+        print(
+            f"{name:<12} {rate:>9.1f} {rate / torch_rate:>7.2f}x {result['mean_cosine']:>9.5f} "
+            f"{result['min_cosine']:>9.5f} {result['max_drift']:>10.5f} {result[f'top{top_k}_overlap']:>7.3f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime embeddings against the PyTorch reference")
+    parser.add_argument("--file", default="data/dpdp_act.txt", help="Texts to embed, chunked like the DPDP Act ingest")
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_max_batch_size)
+    parser.add_argument("--threads", type=int, default=settings.onnx_threads, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+    setup_logging()
+    logger.info(f"Embedding parity check on {args.file}")
+    main(args.file, args.batch_size, args.threads, args.top_k)
\ No newline at end of file
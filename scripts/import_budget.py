@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))      # run as `python scripts/import_budget.py`
+
+from typing import List, Tuple
+import argparse
+import subprocess
+import time
+
+# Modules that must stay out of the import path of the API; they are loaded at warm-up or in workers.
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "onnxruntime", "langchain", "langchain_core",
+                 "langchain_google_genai", "langgraph", "pinecone", "fitz", "docx", "vertexai")
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Import the module in a fresh interpreter; returns wall seconds and (name, self_us, cumulative_us) rows."""
+    root = Path(__file__).resolve().parents[1]
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=root, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"import {module} failed")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return wall, rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check how long importing the API takes and which modules cost the most")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Fail when the import takes longer")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    wall, rows = measure(args.module)
+    print(f"import {args.module}: {wall * 1000:.0f} ms wall, {len(rows)} modules")
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    heavy = sorted({name.strip() for name, _, _ in rows if name.strip().split(".")[0] in HEAVY_MODULES})
+    if heavy:
+        print(f"\nHeavy modules imported eagerly: {', '.join(heavy[:20])}")
+    if wall * 1000 > args.budget_ms or heavy:
+        print(f"\nFAILED: budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\nOK: within {args.budget_ms:.0f} ms")
\ No newline at end of file
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))      # run as `python scripts/process_dpdp_act.py`
+
+from app.core.logging import setup_logging
+from app.db.connection import get_db_pool
+from app.services.document_parser import parse_dpdp_act, format_plan
+from loguru import logger
+import argparse
+import asyncio
+
+async def main(file_path: str, dry_run: bool, full: bool) -> None:
+    pool = await get_db_pool()
+    embedding_service = None
+    try:
+        if not dry_run:
+            from app.services.embedding import EmbeddingService     # dry runs never load the model
+            embedding_service = EmbeddingService()
+            if embedding_service.cache:
+                embedding_service.cache.attach_pool(pool)
+            embedding_service.ensure_vector_stores()
+        plan = await parse_dpdp_act(file_path, pool, embedding_service, dry_run=dry_run, full=full)
+        print(format_plan(plan))
+    finally:
+        if embedding_service:
+            await embedding_service.close()
+        await pool.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally ingest the DPDP Act into Postgres and the vector store")
+    parser.add_argument("--file", default="data/dpdp_act.txt", help="Path to the DPDP Act text file")
+    parser.add_argument("--dry-run", action="store_true", help="Print the section diff without writing anything")
+    parser.add_argument("--full", action="store_true", help="Re-embed every chunk, e.g. after switching vector store")
+    args = parser.parse_args()
+    setup_logging()
+    logger.info(f"Ingesting DPDP Act from {args.file}")
+    asyncio.run(main(args.file, args.dry_run, args.full))
\ No newline at end of file
@@ -0,0 +1,4 @@
+import os
+
+for key in ("POSTGRES_PASSWORD", "PINECONE_API_KEY", "GOOGLE_API_KEY"):     # required by Settings, never used by the tests
+    os.environ.setdefault(key, "test")
@@ -0,0 +1,26 @@
+from app.services.document_parser import IncrementalSplitter
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import List
+
+def split_pages(pages: List[str]) -> List[str]:
+    splitter = IncrementalSplitter(RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=20), flush_size=150)
+    chunks = []
+    for page in pages:
+        chunks.extend(splitter.feed(page))
+    return chunks + splitter.flush()
+
+def test_page_boundary_keeps_words_apart():
+    pages = [("alpha beta gamma delta " * 8) + "ENDPAGEONE\n", "STARTPAGETWO " + ("epsilon zeta eta theta " * 8)]
+    chunks = split_pages(pages)
+
+    assert not any("ENDPAGEONESTARTPAGETWO" in chunk for chunk in chunks)
+    words = [word for chunk in chunks for word in chunk.split()]
+    assert "ENDPAGEONE" in words and "STARTPAGETWO" in words
+
+def test_every_page_word_is_emitted_in_order():
+    pages = [f"page{number} " + " ".join(f"w{number}_{i}" for i in range(40)) + "\n" for number in range(5)]
+    chunks = split_pages(pages)
+
+    expected = [word for page in pages for word in page.split()]
+    emitted = [word for chunk in chunks for word in chunk.split()]
+    assert list(dict.fromkeys(emitted)) == expected     # overlap repeats words, never merges or reorders them
@@ -0,0 +1,69 @@
+from app.services.llm_limiter import LLMLimiter, INTERACTIVE, BATCH
+from typing import List
+import asyncio
+import pytest
+
+def limiter(max_in_flight: int = 1) -> LLMLimiter:     # budgets high enough that only the in-flight cap applies
+    return LLMLimiter(requests_per_minute=60_000, tokens_per_minute=10_000_000, max_in_flight=max_in_flight)
+
+async def call(limiter: LLMLimiter, priority: int, name: str, order: List[str], release: asyncio.Event) -> None:
+    async with limiter.slot(priority, tokens=100):
+        order.append(name)
+        await release.wait()
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_interactive_calls_go_ahead_of_queued_batch_calls():
+    gate, order, release = limiter(), [], asyncio.Event()
+    running = asyncio.create_task(call(gate, BATCH, "running", order, release))
+    await settle()
+    queued = [asyncio.create_task(call(gate, BATCH, "batch-1", order, release)),
+              asyncio.create_task(call(gate, BATCH, "batch-2", order, release))]
+    await settle()
+    queued.append(asyncio.create_task(call(gate, INTERACTIVE, "interactive", order, release)))
+    await settle()
+    assert order == ["running"]
+    assert gate.stats()["queue_depth_interactive"] == 1
+    assert gate.stats()["queue_depth_batch"] == 2
+
+    release.set()
+    await asyncio.gather(running, *queued)
+    assert order == ["running", "interactive", "batch-1", "batch-2"]    # same priority keeps arrival order
+    assert gate.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    gate, order, release = limiter(), [], asyncio.Event()
+    running = asyncio.create_task(call(gate, BATCH, "running", order, release))
+    await settle()
+    cancelled = asyncio.create_task(call(gate, INTERACTIVE, "cancelled", order, release))
+    waiting = asyncio.create_task(call(gate, BATCH, "waiting", order, release))
+    await settle()
+
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    assert gate.stats()["queue_depth"] == 1
+
+    release.set()
+    await asyncio.gather(running, waiting)
+    assert order == ["running", "waiting"]
+    assert gate.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_cancelling_a_granted_slot_gives_it_back():
+    gate, order, release = limiter(), [], asyncio.Event()
+    holder = asyncio.create_task(call(gate, BATCH, "holder", order, release))
+    await settle()
+    assert gate.in_flight == 1
+
+    holder.cancel()
+    await asyncio.gather(holder, return_exceptions=True)
+    assert gate.in_flight == 0
+
+    release.set()
+    await call(gate, BATCH, "next", order, release)
+    assert order == ["holder", "next"]
+    assert gate.in_flight == 0
@@ -0,0 +1,78 @@
+from app.services.document_parser import ParsedChunk, ParsedSection, content_hash, plan_dpdp_ingest
+from typing import Dict, List
+
+def section(number: str, chunks: List[str]) -> ParsedSection:
+    return ParsedSection(
+        number=number, title=f"Section {number}", chapter="II", content="\n".join(chunks),
+        content_hash=content_hash(number, *chunks),
+        chunks=[ParsedChunk(chunk_index=idx, content=text, content_hash=content_hash(text))
+                for idx, text in enumerate(chunks, 1)]
+    )
+
+def stored_rows(sections: List[ParsedSection]) -> List[Dict]:     # what fetch_dpdp_act_index returns after an ingest
+    rows, ids = [], iter(range(1, 1000))
+    for parsed in sections:
+        rows.append({"id": next(ids), "section_number": parsed["number"], "is_chunk": False,
+                     "chunk_index": None, "content_hash": parsed["content_hash"]})
+        rows.extend({"id": next(ids), "section_number": parsed["number"], "is_chunk": True,
+                     "chunk_index": chunk["chunk_index"], "content_hash": chunk["content_hash"]}
+                    for chunk in parsed["chunks"])
+    return rows
+
+def chunk_id(rows: List[Dict], number: str, index: int) -> int:
+    return next(row["id"] for row in rows if row["section_number"] == number and row["chunk_index"] == index)
+
+def test_unchanged_sections_are_skipped():
+    sections = [section("1", ["a", "b"]), section("2", ["c"])]
+    plan = plan_dpdp_ingest(sections, stored_rows(sections))
+    assert plan["changes"] == []
+    assert plan["removed_sections"] == []
+    assert plan["unchanged"] == 2
+
+def test_changed_section_rewrites_only_edited_chunks():
+    rows = stored_rows([section("1", ["a", "b", "c"]), section("2", ["d"])])
+    plan = plan_dpdp_ingest([section("1", ["a", "B", "c"]), section("2", ["d"])], rows)
+
+    assert plan["unchanged"] == 1
+    [change] = plan["changes"]
+    assert change["status"] == "changed"
+    assert change["section"]["number"] == "1"
+    assert [chunk["chunk_index"] for chunk in change["changed_chunks"]] == [2]
+    assert change["removed_chunk_indexes"] == []
+
+def test_new_section_is_added_with_every_chunk():
+    rows = stored_rows([section("1", ["a"])])
+    plan = plan_dpdp_ingest([section("1", ["a"]), section("2", ["b", "c"])], rows)
+
+    [change] = plan["changes"]
+    assert change["status"] == "added"
+    assert [chunk["chunk_index"] for chunk in change["changed_chunks"]] == [1, 2]
+
+def test_removed_chunks_and_sections_are_reported_with_ids():
+    rows = stored_rows([section("1", ["a", "b", "c"]), section("2", ["d", "e"])])
+    plan = plan_dpdp_ingest([section("1", ["a", "b"])], rows)
+
+    [change] = plan["changes"]
+    assert change["changed_chunks"] == []
+    assert change["removed_chunk_indexes"] == [3]
+    assert change["removed_chunk_ids"] == [chunk_id(rows, "1", 3)]
+    assert plan["removed_sections"] == ["2"]
+    assert sorted(plan["removed_section_chunk_ids"]) == [chunk_id(rows, "2", 1), chunk_id(rows, "2", 2)]
+
+def test_unembedded_rows_are_retried():     # hashes stay NULL until the vectors are stored
+    sections = [section("1", ["a", "b"])]
+    rows = stored_rows(sections)
+    for row in rows:
+        if row["chunk_index"] in (None, 2):
+            row["content_hash"] = None
+    [change] = plan_dpdp_ingest(sections, rows)["changes"]
+    assert [chunk["chunk_index"] for chunk in change["changed_chunks"]] == [2]
+
+def test_full_rewrites_every_section_and_chunk():
+    sections = [section("1", ["a", "b"]), section("2", ["c"])]
+    plan = plan_dpdp_ingest(sections, stored_rows(sections), full=True)
+
+    assert plan["unchanged"] == 0
+    assert [change["status"] for change in plan["changes"]] == ["changed", "changed"]
+    assert [len(change["changed_chunks"]) for change in plan["changes"]] == [2, 1]
+    assert all(change["removed_chunk_indexes"] == [] for change in plan["changes"])
@@ -0,0 +1,122 @@
+from app.core.config import settings
+from app.services.regulation_corpus import RegulationCorpus
+from app.usecase import compliance
+from app.usecase.compliance import fuse_matches, match_sections
+from prometheus_client import REGISTRY
+from typing import Dict, List
+import asyncio
+import pytest
+
+def corpus(*chunk_ids: int) -> RegulationCorpus:
+    regulation = RegulationCorpus()
+    regulation.sections = {"4": {"title": "Grounds for processing", "chapter": "II", "content": "", "chunk_ids": list(chunk_ids)}}
+    regulation.chunks = {chunk_id: {"section_number": "4", "chunk_index": chunk_id, "content": f"chunk {chunk_id}"}
+                         for chunk_id in chunk_ids}
+    return regulation
+
+def vector_hit(chunk_id: int, score: float) -> Dict:
+    return {"id": str(chunk_id), "score": score,
+            "metadata": {"section_number": "4", "chunk_index": chunk_id, "content": f"stored {chunk_id}"}}
+
+def lexical_hit(chunk_id: int) -> Dict:
+    return {"id": chunk_id, "section_number": "4", "rank": 1.0}
+
+def fallbacks(failed: str) -> float:
+    return REGISTRY.get_sample_value("compliguard_retrieval_fallbacks_total", {"failed": failed}) or 0.0
+
+@pytest.fixture(autouse=True)
+def retrieval_settings(monkeypatch):
+    monkeypatch.setattr(settings, "retrieval_mode", "hybrid")
+    monkeypatch.setattr(settings, "retrieval_top_k", 10)
+    monkeypatch.setattr(settings, "retrieval_min_score", 0.75)
+    monkeypatch.setattr(settings, "retrieval_rrf_k", 60)
+    monkeypatch.setattr(settings, "retrieval_vector_timeout_seconds", 1.0)
+
+def test_hits_found_by_both_retrievers_rank_first():
+    sections = fuse_matches([vector_hit(1, 0.9), vector_hit(2, 0.8)], [lexical_hit(3), lexical_hit(2)], corpus(1, 2, 3))
+    assert [section["chunk_id"] for section in sections] == [2, 1, 3]     # ties keep vector order first
+    assert sections[0]["score"] == pytest.approx(1 / 62 + 1 / 62)
+    assert sections[0]["content"] == "chunk 2"      # full text from the corpus, not the stored metadata
+
+def test_vector_only_hits_need_the_min_score():
+    sections = fuse_matches([vector_hit(1, 0.9), vector_hit(2, 0.6)], [lexical_hit(3)], corpus(1, 2, 3))
+    assert [section["chunk_id"] for section in sections] == [1, 3]
+
+def test_low_scoring_vector_hit_is_kept_when_lexical_also_finds_it():
+    sections = fuse_matches([vector_hit(2, 0.6)], [lexical_hit(2)], corpus(2))
+    assert [section["chunk_id"] for section in sections] == [2]
+
+def test_results_are_capped_at_top_k(monkeypatch):
+    monkeypatch.setattr(settings, "retrieval_top_k", 2)
+    sections = fuse_matches([], [lexical_hit(chunk_id) for chunk_id in (1, 2, 3)], corpus(1, 2, 3))
+    assert [section["chunk_id"] for section in sections] == [1, 2]
+
+def test_chunk_missing_from_corpus_falls_back_to_vector_metadata():
+    [section] = fuse_matches([vector_hit(9, 0.9)], [], corpus(1))
+    assert section["chunk_id"] is None
+    assert section["content"] == "stored 9"
+
+class FakeEmbeddingService:
+    def __init__(self, matches: List[Dict], error: Exception | None = None, delay: float = 0.0):
+        self.matches = matches
+        self.error = error
+        self.delay = delay
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [[1.0, 0.0] for _ in texts]
+
+    async def query_embeddings(self, vector: List[float], namespace: str, top_k: int = 10) -> List[Dict]:
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.matches
+
+def lexical_search(rows: List[Dict], error: Exception | None = None):
+    async def search_dpdp_chunks(pool, query_text: str, limit: int) -> List[Dict]:
+        if error:
+            raise error
+        return rows
+    return search_dpdp_chunks
+
+@pytest.mark.asyncio
+async def test_hybrid_fuses_both_retrievers(monkeypatch):
+    monkeypatch.setattr(compliance, "search_dpdp_chunks", lexical_search([lexical_hit(2)]))
+    [sections] = await match_sections(FakeEmbeddingService([vector_hit(1, 0.9), vector_hit(2, 0.8)]), corpus(1, 2), None, ["text"])
+    assert [section["chunk_id"] for section in sections] == [2, 1]
+
+@pytest.mark.asyncio
+async def test_vector_failure_falls_back_to_lexical(monkeypatch):
+    monkeypatch.setattr(compliance, "search_dpdp_chunks", lexical_search([lexical_hit(2)]))
+    before = fallbacks("vector")
+    [sections] = await match_sections(FakeEmbeddingService([], error=RuntimeError("index down")), corpus(1, 2), None, ["text"])
+    assert [section["chunk_id"] for section in sections] == [2]
+    assert fallbacks("vector") == before + 1
+
+@pytest.mark.asyncio
+async def test_slow_vector_queries_fall_back_to_lexical(monkeypatch):
+    monkeypatch.setattr(settings, "retrieval_vector_timeout_seconds", 0.01)
+    monkeypatch.setattr(compliance, "search_dpdp_chunks", lexical_search([lexical_hit(2)]))
+    before = fallbacks("vector")
+    service = FakeEmbeddingService([vector_hit(1, 0.9)], delay=1.0)
+    [sections] = await match_sections(service, corpus(1, 2), None, ["text"])
+    assert [section["chunk_id"] for section in sections] == [2]
+    assert fallbacks("vector") == before + 1
+
+@pytest.mark.asyncio
+async def test_lexical_failure_falls_back_to_vector(monkeypatch):
+    monkeypatch.setattr(compliance, "search_dpdp_chunks", lexical_search([], error=RuntimeError("db down")))
+    before = fallbacks("lexical")
+    [sections] = await match_sections(FakeEmbeddingService([vector_hit(1, 0.9)]), corpus(1), None, ["text"])
+    assert [section["chunk_id"] for section in sections] == [1]
+    assert fallbacks("lexical") == before + 1
+
+@pytest.mark.asyncio
+async def test_single_retriever_modes_raise_their_errors(monkeypatch):
+    monkeypatch.setattr(settings, "retrieval_mode", "vector")
+    with pytest.raises(RuntimeError):
+        await match_sections(FakeEmbeddingService([], error=RuntimeError("index down")), corpus(1), None, ["text"])
+
+    monkeypatch.setattr(settings, "retrieval_mode", "lexical")
+    monkeypatch.setattr(compliance, "search_dpdp_chunks", lexical_search([], error=RuntimeError("db down")))
+    with pytest.raises(RuntimeError):
+        await match_sections(FakeEmbeddingService([]), corpus(1), None, ["text"])